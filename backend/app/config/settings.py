@@ -4,16 +4,50 @@ Configuration settings and environment variable validation for Auth Gateway.
 import os
 import re
 import logging
-from typing import Optional, List
-from pydantic import field_validator
-from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from functools import cached_property, lru_cache
+from typing import Annotated, Any, Callable, Optional, List
+from pydantic import field_validator, model_validator
+from pydantic_settings import BaseSettings, NoDecode
 
 logger = logging.getLogger(__name__)
 
+# Required settings checked by Settings.validate_required_config, with what they are needed for
+_REQUIRED_FIELDS = (
+    ("firebase_api_key", "Firebase integration"),
+    ("firebase_auth_domain", "Firebase integration"),
+    ("firebase_project_id", "Firebase integration"),
+    ("google_client_id", "Google OAuth integration"),
+    ("google_client_secret", "Google OAuth integration"),
+    ("gateway_public_url", "the auth callback URL"),
+)
+
+# Domain patterns of the form ".*@<domain>$" or ".*@(<domain>|<domain>...)$" reduce to a set lookup
+_DOMAIN_LITERAL = r"(?:[\w-]|\\\.)+"
+_DOMAIN_ALLOWLIST_PATTERN = re.compile(
+    rf"\^?\.\*@(?:\((?:\?:)?({_DOMAIN_LITERAL}(?:\|{_DOMAIN_LITERAL})*)\)|({_DOMAIN_LITERAL}))\$?"
+)
+
+# Other domain patterns of the form ".*<literal>$" reduce to a plain suffix test
+_LITERAL_SUFFIX_PATTERN = re.compile(r"\^?\.\*((?:[\w@-]|\\[.@-])+)\$")
+
+# Shared pattern for unset, ".*" and invalid domain regexes; all of them allow every domain
+_ALLOW_ALL_PATTERN = re.compile(".*", re.IGNORECASE | re.ASCII)
+
+
+def _single_line_ascii_or_pattern(fast_match: Callable[[str], bool], pattern: re.Pattern) -> Callable[[str], Any]:
+    """
+    Use fast_match for single-line ASCII emails and the full pattern for anything else.
+    
+    The pattern is matched with re.IGNORECASE | re.ASCII and its ".*" stops at newlines, so
+    str.lower() and plain string tests only give the regex's answers for such emails.
+    """
+    def matcher(email: str) -> Any:
+        if email.isascii() and "\n" not in email:
+            return fast_match(email)
+        return pattern.fullmatch(email)
+    
+    return matcher
+
 
 class Settings(BaseSettings):
     """Application settings with validation."""
@@ -34,7 +68,7 @@ class Settings(BaseSettings):
     allowed_email_domain_regex: str = ".*"
     
     # CORS Configuration
-    cors_allowed_origins: str = ""
+    cors_allowed_origins: Annotated[List[str], NoDecode] = []
     
     # Application Configuration
     log_level: str = "INFO"
@@ -46,13 +80,15 @@ class Settings(BaseSettings):
         "extra": "ignore"  # Ignore extra environment variables
     }
     
-    @field_validator('cors_allowed_origins')
+    @field_validator('cors_allowed_origins', mode='before')
     @classmethod
     def validate_cors_origins(cls, v):
-        """Validate and parse CORS origins."""
+        """Parse a comma-separated CORS origins string into a list."""
         if not v:
             return []
-        return [origin.strip() for origin in v.split(",") if origin.strip()]
+        if isinstance(v, str):
+            v = v.split(",")
+        return [origin for origin in map(str.strip, v) if origin]
     
     @field_validator('allowed_email_domain_regex')
     @classmethod
@@ -65,48 +101,78 @@ class Settings(BaseSettings):
             logger.warning(f"Invalid email domain regex '{v}': {e}. Using default '.*'")
             return ".*"
     
-    @field_validator('firebase_api_key', 'firebase_auth_domain', 'firebase_project_id')
-    @classmethod
-    def validate_firebase_config(cls, v, info):
-        """Validate required Firebase configuration."""
-        if not v:
-            raise ValueError(f"{info.field_name} is required for Firebase integration")
-        return v
-    
-    @field_validator('google_client_id', 'google_client_secret')
-    @classmethod
-    def validate_google_config(cls, v, info):
-        """Validate required Google OAuth configuration."""
-        if not v:
-            raise ValueError(f"{info.field_name} is required for Google OAuth integration")
-        return v
-    
-    @field_validator('gateway_public_url')
-    @classmethod
-    def validate_gateway_url(cls, v):
-        """Validate gateway public URL."""
-        if not v:
-            raise ValueError("GATEWAY_PUBLIC_URL is required")
-        if not v.startswith(('http://', 'https://')):
+    @model_validator(mode='after')
+    def validate_required_config(self):
+        """Validate required Firebase, Google OAuth and gateway configuration in one pass."""
+        for field_name, purpose in _REQUIRED_FIELDS:
+            if not getattr(self, field_name):
+                raise ValueError(f"{field_name} is required for {purpose}")
+        if not self.gateway_public_url.startswith(('http://', 'https://')):
             raise ValueError("GATEWAY_PUBLIC_URL must start with http:// or https://")
-        return v.rstrip('/')
+        if self.gateway_public_url.endswith('/'):
+            self.gateway_public_url = self.gateway_public_url.rstrip('/')
+        return self
     
-    def get_cors_origins(self) -> List[str]:
-        """Get parsed CORS origins."""
-        return self.cors_allowed_origins
+    @cached_property
+    def email_domain_pattern(self) -> re.Pattern:
+        """Get the compiled email domain regex, built once per settings instance."""
+        if self.allowed_email_domain_regex in ("", ".*"):
+            return _ALLOW_ALL_PATTERN
+        try:
+            return re.compile(self.allowed_email_domain_regex, re.IGNORECASE | re.ASCII)
+        except re.error as e:
+            logger.error(f"Invalid domain regex pattern: {e}")
+            # Fall back to allow all domains
+            logger.warning("Using fallback regex to allow all domains")
+            return _ALLOW_ALL_PATTERN
+    
+    @cached_property
+    def email_domain_matcher(self) -> Callable[[str], Any]:
+        """Get a callable testing an email against the domain pattern, avoiding the regex for literal domains."""
+        pattern = self.email_domain_pattern
+        if not self.allowed_email_domain_regex.isascii():
+            return pattern.fullmatch
+        allowlist = _DOMAIN_ALLOWLIST_PATTERN.fullmatch(self.allowed_email_domain_regex)
+        if allowlist:
+            domains = frozenset(
+                domain.replace("\\.", ".").lower()
+                for domain in (allowlist.group(1) or allowlist.group(2)).split("|")
+            )
+            
+            def in_allowlist(email: str) -> bool:
+                _, sep, domain = email.rpartition("@")
+                return bool(sep) and domain.lower() in domains
+            
+            return _single_line_ascii_or_pattern(in_allowlist, pattern)
+        literal = _LITERAL_SUFFIX_PATTERN.fullmatch(self.allowed_email_domain_regex)
+        if literal:
+            suffix = re.sub(r"\\(.)", r"\1", literal.group(1)).lower()
+            return _single_line_ascii_or_pattern(lambda email: email.lower().endswith(suffix), pattern)
+        return pattern.fullmatch
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Get application settings with caching."""
     return Settings()
 
 
+_LOG_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+
 def setup_logging(settings: Settings) -> None:
     """Setup application logging configuration."""
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    level = _LOG_LEVELS.get(settings.log_level.upper(), logging.INFO)
     
     logging.basicConfig(
-        level=getattr(logging, settings.log_level.upper()),
+        level=level,
         format=log_format,
         handlers=[
             logging.StreamHandler()
@@ -114,7 +180,7 @@ def setup_logging(settings: Settings) -> None:
     )
     
     # Set specific loggers
-    logging.getLogger("auth-gateway").setLevel(getattr(logging, settings.log_level.upper()))
+    logging.getLogger("auth-gateway").setLevel(level)
     
     # Reduce noise from external libraries in production
     if settings.environment == "production":
@@ -4,19 +4,28 @@ Main FastAPI application for Auth Gateway.
 This is the new modular version that replaces the monolithic main.py.
 All business logic has been moved to services, routes, and models.
 """
+import asyncio
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Header, Depends
+from functools import lru_cache
+from typing import Optional
+import orjson
+from fastapi import FastAPI, HTTPException, Header, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
-from .config import get_settings, setup_logging, Settings
+from .config import get_settings, setup_logging
 from .routes import auth_router, health_router
-from .models.responses import UserData
+from .routes.auth import get_token_service, get_domain_service
+from .models.requests import VerifyTokensRequest
+from .models.responses import TokenVerificationResult, UserData, VerifyTokensResponse
+from .services import TokenService, DomainService, create_http_client
 
-# Initialize settings and logging
+# Initialize settings and logging (skip handler setup if logging is already configured)
 settings = get_settings()
-setup_logging(settings)
+if not logging.getLogger().handlers:
+    setup_logging(settings)
 
 logger = logging.getLogger(__name__)
 
@@ -25,28 +34,37 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
-    logger.info(f"Starting Auth Gateway in {settings.environment} mode")
-    logger.info(f"CORS origins configured: {len(settings.get_cors_origins())} origins")
-    logger.info(f"Domain restriction active: {settings.allowed_email_domain_regex != '.*'}")
+    logger.info("Starting Auth Gateway in %s mode", settings.environment)
+    logger.info("CORS origins configured: %d origins", len(settings.cors_allowed_origins))
+    logger.info("Domain restriction active: %s", settings.allowed_email_domain_regex != '.*')
+    
+    # Shared keep-alive client for outbound token exchange requests
+    app.state.http_client = create_http_client()
     
     yield
     
     # Shutdown
+    await app.state.http_client.aclose()
     logger.info("Auth Gateway shutting down")
 
 
+# Disable the docs UIs and OpenAPI schema generation entirely in production
+if settings.environment == "production":
+    openapi_kwargs = dict(docs_url=None, redoc_url=None, openapi_url=None)
+else:
+    openapi_kwargs = {}
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Auth Gateway",
     description="A reusable authentication service for internal applications",
     version="1.0.0",
     lifespan=lifespan,
-    docs_url="/docs" if settings.environment != "production" else None,
-    redoc_url="/redoc" if settings.environment != "production" else None
+    **openapi_kwargs
 )
 
 # Configure CORS
-cors_origins = settings.get_cors_origins()
+cors_origins = settings.cors_allowed_origins
 if cors_origins:
     app.add_middleware(
         CORSMiddleware,
@@ -55,7 +73,7 @@ if cors_origins:
         allow_methods=["*"],
         allow_headers=["*"],
     )
-    logger.info(f"CORS configured with {len(cors_origins)} allowed origins")
+    logger.info("CORS configured with %d allowed origins", len(cors_origins))
 else:
     logger.warning("No CORS origins configured - this may cause issues in production")
 
@@ -63,46 +81,86 @@ else:
 app.include_router(health_router)
 app.include_router(auth_router)
 
+@lru_cache(maxsize=1024)
+def _cached_user_data(
+    uid: str, email: str, display_name: Optional[str], photo_url: Optional[str]
+) -> UserData:
+    """Build UserData once per distinct set of claims; repeats share the frozen instance."""
+    return UserData(uid=uid, email=email, display_name=display_name, photo_url=photo_url)
+
+
+def _verify_user(token: str, token_service: TokenService, domain_service: DomainService) -> UserData:
+    """Verify a token, its claims and the user's email domain; raises HTTPException if rejected."""
+    # Verify token and extract claims
+    decoded_token = token_service.verify_token(token)
+    token_service.validate_token_claims(decoded_token)
+    
+    # Extract user data
+    user_data_dict = token_service.extract_user_data(decoded_token)
+    email = user_data_dict.get("email", "")
+    
+    # Validate email domain
+    domain_service.validate_and_raise(email)
+    
+    return _cached_user_data(**user_data_dict)
+
+
+def _verification_result(
+    token: str, token_service: TokenService, domain_service: DomainService
+) -> TokenVerificationResult:
+    """Verify one token of a batch, reporting a rejection as a result instead of raising."""
+    try:
+        return TokenVerificationResult(user=_verify_user(token, token_service, domain_service))
+    except HTTPException as e:
+        return TokenVerificationResult(status_code=e.status_code, message=e.detail)
+    except Exception as e:
+        logger.error("Token verification failed: %s", type(e).__name__)
+        return TokenVerificationResult(status_code=401, message="Token verification failed")
+
+
 # Add token verification endpoint at root level
 @app.post("/verify-token", response_model=UserData, tags=["authentication"])
 async def verify_id_token(
     authorization: str = Header(None),
-    settings: Settings = Depends(get_settings)
+    token_service: TokenService = Depends(get_token_service),
+    domain_service: DomainService = Depends(get_domain_service)
 ):
     """Verify a Firebase ID token and return user data if valid."""
-    from .services import TokenService, DomainService
-    
     try:
         # Extract token from header
-        token_service = TokenService()
         token = token_service.extract_token_from_header(authorization)
         
-        # Verify token and extract claims
-        decoded_token = token_service.verify_token(token)
-        token_service.validate_token_claims(decoded_token)
-        
-        # Extract user data
-        user_data_dict = token_service.extract_user_data(decoded_token)
-        email = user_data_dict.get("email", "")
-        
-        # Validate email domain
-        domain_service = DomainService(settings)
-        domain_service.validate_and_raise(email)
-        
+        user_data = _verify_user(token, token_service, domain_service)
         logger.debug("Token verification completed successfully")
-        return UserData(**user_data_dict)
+        return user_data
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Token verification failed: {type(e).__name__}")
+        logger.error("Token verification failed: %s", type(e).__name__)
         raise HTTPException(status_code=401, detail="Token verification failed")
 
+
+@app.post("/verify-tokens", response_model=VerifyTokensResponse, tags=["authentication"])
+async def verify_id_tokens(
+    request: VerifyTokensRequest,
+    token_service: TokenService = Depends(get_token_service),
+    domain_service: DomainService = Depends(get_domain_service)
+):
+    """Verify a batch of Firebase ID tokens in one request, with one result per token."""
+    # Uncached verifications call Firebase, so run them concurrently off the event loop
+    results = await asyncio.gather(*(
+        run_in_threadpool(_verification_result, token, token_service, domain_service)
+        for token in request.tokens
+    ))
+    logger.debug("Batch verification completed for %d tokens", len(results))
+    return VerifyTokensResponse(results=results)
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler for unhandled exceptions."""
-    logger.error(f"Unhandled exception: {type(exc).__name__} - {str(exc)}")
+    logger.error("Unhandled exception: %s - %s", type(exc).__name__, exc)
     
     # Don't expose internal errors in production
     if settings.environment == "production":
@@ -124,10 +182,13 @@ async def global_exception_handler(request, exc):
 
 
 # Health check for load balancers (duplicate of /health but at root level)
+_PING_BODY = orjson.dumps({"status": "ok"})
+
+
 @app.get("/ping")
 async def ping():
     """Simple ping endpoint for load balancer health checks."""
-    return {"status": "ok"}
+    return Response(content=_PING_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
@@ -2,22 +2,28 @@
 
 from .requests import (
     AuthCallbackRequest,
-    LoginRequest
+    LoginRequest,
+    VerifyTokensRequest
 )
 from .responses import (
     UserData,
     AuthCallbackResponse,
     LoginResponse,
     ErrorResponse,
-    HealthResponse
+    HealthResponse,
+    TokenVerificationResult,
+    VerifyTokensResponse
 )
 
 __all__ = [
     "AuthCallbackRequest",
     "LoginRequest",
+    "VerifyTokensRequest",
     "UserData",
     "AuthCallbackResponse",
     "LoginResponse",
     "ErrorResponse",
-    "HealthResponse"
+    "HealthResponse",
+    "TokenVerificationResult",
+    "VerifyTokensResponse"
 ]
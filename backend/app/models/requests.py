@@ -1,37 +1,33 @@
 """
 Request models for Auth Gateway API endpoints.
 """
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional
-import re
+from pydantic import AfterValidator, BaseModel, Field, field_validator
+from typing import Annotated, List, Optional
+from urllib.parse import urlparse
+
+
+def _validate_redirect_uri(v: str) -> str:
+    """Validate redirect URI format."""
+    if not v.startswith(('http://', 'https://')):
+        raise ValueError("redirect_uri must start with http:// or https://")
+    # Basic URL validation
+    parsed = urlparse(v)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise ValueError("redirect_uri must be a valid URL")
+    return v
+
+
+# Shared redirect URI type so every field using it reuses one validator schema
+RedirectURI = Annotated[str, AfterValidator(_validate_redirect_uri)]
 
 
 class LoginRequest(BaseModel):
     """Request model for login endpoint."""
     
-    redirect_uri: Optional[str] = Field(
+    redirect_uri: Optional[RedirectURI] = Field(
         None,
         description="Client application redirect URI after successful authentication"
     )
-    
-    @field_validator('redirect_uri')
-    @classmethod
-    def validate_redirect_uri(cls, v):
-        """Validate redirect URI format."""
-        if v is not None:
-            if not v.startswith(('http://', 'https://')):
-                raise ValueError("redirect_uri must start with http:// or https://")
-            # Basic URL validation
-            url_pattern = re.compile(
-                r'^https?://'  # http:// or https://
-                r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-                r'localhost|'  # localhost...
-                r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-                r'(?::\d+)?'  # optional port
-                r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-            if not url_pattern.match(v):
-                raise ValueError("redirect_uri must be a valid URL")
-        return v
 
 
 class AuthCallbackRequest(BaseModel):
@@ -57,3 +53,18 @@ class AuthCallbackRequest(BaseModel):
         if not v or not v.strip():
             raise ValueError("Authorization code cannot be empty")
         return v.strip()
+
+
+# Upper bound on tokens per batch verification request
+MAX_BATCH_TOKENS = 100
+
+
+class VerifyTokensRequest(BaseModel):
+    """Request model for batch token verification endpoint."""
+    
+    tokens: List[str] = Field(
+        ...,
+        description="Firebase ID tokens to verify",
+        min_length=1,
+        max_length=MAX_BATCH_TOKENS
+    )
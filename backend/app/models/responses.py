@@ -1,13 +1,16 @@
 """
 Response models for Auth Gateway API endpoints.
 """
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, Dict, Any, List
 
 
 class UserData(BaseModel):
     """User data model for authenticated users."""
     
+    # Immutable: verification hands the same cached instance to every request for a user
+    model_config = ConfigDict(frozen=True)
+    
     uid: str = Field(..., description="Unique user identifier from Firebase")
     email: str = Field(..., description="User email address")
     display_name: Optional[str] = Field(None, description="User display name")
@@ -48,3 +51,21 @@ class LogoutResponse(BaseModel):
     
     status: str = Field(..., description="Logout status")
     message: Optional[str] = Field(None, description="Logout message")
+
+
+class TokenVerificationResult(BaseModel):
+    """Outcome of verifying one token in a batch."""
+    
+    user: Optional[UserData] = Field(None, description="User data if the token is valid")
+    status_code: Optional[int] = Field(
+        None, description="Status /verify-token would have returned for an invalid token"
+    )
+    message: Optional[str] = Field(None, description="Reason the token was rejected")
+
+
+class VerifyTokensResponse(BaseModel):
+    """Response model for batch token verification endpoint."""
+    
+    results: List[TokenVerificationResult] = Field(
+        ..., description="One result per requested token, in request order"
+    )
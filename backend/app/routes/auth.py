@@ -2,11 +2,13 @@
 Authentication endpoints for Auth Gateway.
 """
 import logging
+from functools import lru_cache
 from typing import Optional
+import httpx
 from fastapi import APIRouter, HTTPException, Depends, Header, Request
 from fastapi.responses import RedirectResponse, HTMLResponse
 
-from ..config import Settings, get_settings
+from ..config import get_settings
 from ..models.requests import LoginRequest, AuthCallbackRequest
 from ..models.responses import (
     LoginResponse, 
@@ -22,25 +24,40 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
+@lru_cache(maxsize=1)
 def get_token_service() -> TokenService:
-    """Dependency to get token service instance."""
+    """Dependency to get the shared token service instance."""
     return TokenService()
 
 
-def get_domain_service(settings: Settings = Depends(get_settings)) -> DomainService:
-    """Dependency to get domain service instance."""
-    return DomainService(settings)
+@lru_cache(maxsize=1)
+def get_domain_service() -> DomainService:
+    """Dependency to get the shared domain service instance."""
+    return DomainService(get_settings())
 
 
-def get_auth_service(settings: Settings = Depends(get_settings)) -> AuthService:
-    """Dependency to get auth service instance."""
-    return AuthService(settings)
+def get_auth_service(request: Request) -> AuthService:
+    """Dependency to get the shared auth service instance."""
+    # The client is created and closed by the app's lifespan; a fallback client built here
+    # would be cached and never closed
+    http_client = getattr(request.app.state, "http_client", None)
+    if http_client is None:
+        raise RuntimeError(
+            "HTTP client not initialized; run the app with its lifespan "
+            "(e.g. use TestClient as a context manager)"
+        )
+    return _shared_auth_service(http_client)
+
+
+@lru_cache(maxsize=1)
+def _shared_auth_service(http_client: httpx.AsyncClient) -> AuthService:
+    """Build the auth service once for the application's HTTP client."""
+    return AuthService(get_settings(), http_client)
 
 
 def get_token_from_header(authorization: Optional[str] = Header(None)) -> str:
     """Extract token from Authorization header."""
-    token_service = TokenService()
-    return token_service.extract_token_from_header(authorization)
+    return get_token_service().extract_token_from_header(authorization)
 
 
 @router.post("/login", response_model=LoginResponse)
@@ -56,7 +73,7 @@ async def login(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to generate authentication URL: {type(e).__name__}")
+        logger.error("Failed to generate authentication URL: %s", type(e).__name__)
         raise HTTPException(status_code=500, detail="Failed to generate authentication URL")
 
 
@@ -79,7 +96,7 @@ async def auth_callback_post(
         )
         
         # Exchange code for token
-        token_data = auth_service.exchange_code_for_token(request.code, request_uri)
+        token_data = await auth_service.exchange_code_for_token(request.code, request_uri)
         
         # Get ID token
         id_token = token_data.get("idToken")
@@ -107,7 +124,7 @@ async def auth_callback_post(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Authentication callback failed: {type(e).__name__}")
+        logger.error("Authentication callback failed: %s", type(e).__name__)
         raise HTTPException(status_code=500, detail="Authentication failed")
 
 
@@ -138,7 +155,7 @@ async def auth_callback_get(
         )
         
         # Exchange code for token
-        token_data = auth_service.exchange_code_for_token(code, request_uri)
+        token_data = await auth_service.exchange_code_for_token(code, request_uri)
         
         # Get ID token
         id_token = token_data.get("idToken")
@@ -165,17 +182,26 @@ async def auth_callback_get(
         return RedirectResponse(redirect_url)
         
     except HTTPException as e:
-        logger.warning(f"Authentication callback GET failed: {e.detail}")
+        logger.warning("Authentication callback GET failed: %s", e.detail)
         return HTMLResponse(f"Authentication failed: {e.detail}", status_code=e.status_code)
     except Exception as e:
-        logger.error(f"Authentication callback GET failed: {type(e).__name__}")
+        logger.error("Authentication callback GET failed: %s", type(e).__name__)
         return HTMLResponse("Authentication failed", status_code=500)
 
 
 @router.post("/logout", response_model=LogoutResponse)
-async def logout():
+async def logout(
+    authorization: Optional[str] = Header(None),
+    token_service: TokenService = Depends(get_token_service)
+):
     """Handle logout."""
-    # Firebase authentication is stateless, so we don't need to do anything server-side
-    # The client will handle clearing tokens
+    # Firebase authentication is stateless; the client will handle clearing tokens.
+    # If the token is sent along, forget its cached verification result. The token itself
+    # is not invalidated and keeps verifying until it expires.
+    if authorization:
+        try:
+            token_service.forget(token_service.extract_token_from_header(authorization))
+        except HTTPException:
+            pass
     logger.info("Logout request processed")
     return LogoutResponse(status="ok", message="Logout successful")
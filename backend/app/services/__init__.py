@@ -2,6 +2,6 @@
 
 from .token_service import TokenService
 from .domain_service import DomainService
-from .auth_service import AuthService
+from .auth_service import AuthService, create_http_client
 
-__all__ = ["TokenService", "DomainService", "AuthService"]
+__all__ = ["TokenService", "DomainService", "AuthService", "create_http_client"]
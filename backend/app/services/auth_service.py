@@ -1,29 +1,96 @@
 """
 Authentication service for handling OAuth flows and token exchange.
 """
-import json
+import asyncio
 import logging
 import urllib.parse
+from functools import lru_cache
+from urllib.parse import urlparse
 from typing import Dict, Any, Optional, Tuple
 from fastapi import HTTPException, Request
-import requests
+import httpx
+import orjson
 
 from ..config import Settings
 
 logger = logging.getLogger(__name__)
 
+# Maximum in-flight requests to each upstream (Google, Firebase) during login bursts
+UPSTREAM_CONCURRENCY = 64
+
+GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/auth"
+GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
+FIREBASE_SIGN_IN_URL = "https://identitytoolkit.googleapis.com/v1/accounts:signInWithIdp"
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the keep-alive HTTP client used for Google and Firebase token exchange."""
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=200,
+            max_keepalive_connections=50,
+            keepalive_expiry=60.0
+        ),
+        timeout=httpx.Timeout(connect=5.0, read=30.0, write=10.0, pool=5.0)
+    )
+
+
+@lru_cache(maxsize=128)
+def _callback_url_from_redirect_uri(redirect_uri: str) -> str:
+    """Build the gateway callback URL on the redirect URI's origin; client apps reuse a few URIs."""
+    scheme_end = redirect_uri.find("://")
+    if scheme_end > 0:
+        # Fast path: the netloc runs up to the first "/", "?" or "#"
+        rest = redirect_uri[scheme_end + 3:]
+        host_end = len(rest)
+        for sep in "/?#":
+            index = rest.find(sep, 0, host_end)
+            if index >= 0:
+                host_end = index
+        scheme, netloc = redirect_uri[:scheme_end], rest[:host_end]
+    else:
+        parsed_uri = urlparse(redirect_uri)
+        scheme, netloc = parsed_uri.scheme, parsed_uri.netloc
+    return f"{scheme}://{netloc}/auth/callback"
+
 
 class AuthService:
     """Service for handling Google OAuth authentication flow."""
     
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, http_client: Optional[httpx.AsyncClient] = None):
         """
         Initialize authentication service.
         
         Args:
             settings: Application settings
+            http_client: Shared HTTP client for outbound token exchange requests;
+                a new one is created if not provided
         """
         self.settings = settings
+        self._client = http_client or create_http_client()
+        self._google_sem = asyncio.Semaphore(UPSTREAM_CONCURRENCY)
+        self._firebase_sem = asyncio.Semaphore(UPSTREAM_CONCURRENCY)
+        
+        # The callback URL for Google MUST point back to this gateway service
+        self._callback_url = f"{settings.gateway_public_url}/auth/callback"
+        
+        # Everything in the Google OAuth URL except the client redirect URI in the
+        # state is fixed for the process: {"redirect_uri":<per call>,"callback_url":...}
+        oauth_params = {
+            "client_id": settings.google_client_id,
+            "redirect_uri": self._callback_url,
+            "response_type": "code",
+            "scope": "email profile"
+        }
+        self._oauth_prefix = (
+            f"{GOOGLE_AUTH_URL}?"
+            f"{urllib.parse.urlencode(oauth_params, quote_via=urllib.parse.quote)}&state="
+            + urllib.parse.quote_from_bytes(b'{"redirect_uri":', safe="")
+        )
+        self._state_suffix = urllib.parse.quote_from_bytes(
+            b',"callback_url":' + orjson.dumps(self._callback_url) + b'}', safe=""
+        )
     
     def create_google_auth_url(self, redirect_uri: Optional[str] = None) -> str:
         """
@@ -56,40 +123,14 @@ class AuthService:
                 detail="Gateway public URL not configured"
             )
         
-        # The callback URL for Google MUST point back to this gateway service
-        callback_url = f"{self.settings.gateway_public_url}/auth/callback"
         logger.debug("Creating Google OAuth URL with gateway callback")
         
-        # Store the original client redirect URI and gateway callback URL in state
-        state_data = {
-            "redirect_uri": final_redirect,
-            "callback_url": callback_url
-        }
-        state_raw = json.dumps(state_data)
-        
-        # Build Google OAuth URL
-        base_url = "https://accounts.google.com/o/oauth2/auth"
-        
-        # Create parameters dictionary
-        params = {
-            "client_id": self.settings.google_client_id,
-            "redirect_uri": callback_url,
-            "response_type": "code",
-            "scope": "email profile"
-        }
-        
-        # Build query string, encoding each parameter
-        query_params = [f"{k}={urllib.parse.quote(v)}" for k, v in params.items()]
-        
-        # Add state parameter with proper encoding
-        query_params.append(f"state={urllib.parse.quote(state_raw)}")
-        
-        # Join all parameters
-        query_string = "&".join(query_params)
-        
-        return f"{base_url}?{query_string}"
+        # Store the original client redirect URI and gateway callback URL in state;
+        # only the client redirect URI needs encoding per call
+        redirect_bytes = orjson.dumps(final_redirect)
+        return self._oauth_prefix + urllib.parse.quote_from_bytes(redirect_bytes, safe="") + self._state_suffix
     
-    def exchange_code_for_token(self, code: str, request_uri: Optional[str] = None) -> Dict[str, Any]:
+    async def exchange_code_for_token(self, code: str, request_uri: Optional[str] = None) -> Dict[str, Any]:
         """
         Exchange Google authorization code for Firebase token.
         
@@ -109,17 +150,17 @@ class AuthService:
             raise HTTPException(status_code=500, detail="OAuth configuration missing")
         
         # Step 1: Exchange Google Auth Code for Google Tokens
-        google_token_data = self._exchange_google_code(code, request_uri)
+        google_token_data = await self._exchange_google_code(code, request_uri)
         
         # Step 2: Exchange Google ID Token for Firebase Token
-        firebase_token_data = self._exchange_firebase_token(
+        firebase_token_data = await self._exchange_firebase_token(
             google_token_data.get("id_token"), 
             request_uri
         )
         
         return firebase_token_data
     
-    def _exchange_google_code(self, code: str, request_uri: Optional[str]) -> Dict[str, Any]:
+    async def _exchange_google_code(self, code: str, request_uri: Optional[str]) -> Dict[str, Any]:
         """
         Exchange Google authorization code for Google tokens.
         
@@ -133,7 +174,6 @@ class AuthService:
         Raises:
             HTTPException: If exchange fails
         """
-        google_token_url = "https://oauth2.googleapis.com/token"
         google_payload = {
             'code': code,
             'client_id': self.settings.google_client_id,
@@ -145,9 +185,10 @@ class AuthService:
         logger.debug("Exchanging Google authorization code")
         
         try:
-            response = requests.post(google_token_url, data=google_payload, timeout=30)
+            async with self._google_sem:
+                response = await self._client.post(GOOGLE_TOKEN_URL, data=google_payload)
             response.raise_for_status()
-            token_data = response.json()
+            token_data = orjson.loads(response.content)
             
             if "id_token" not in token_data:
                 logger.error("Google token exchange succeeded but no ID token returned")
@@ -159,17 +200,17 @@ class AuthService:
             logger.debug("Google token exchange successful")
             return token_data
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error("Google token exchange timed out")
             raise HTTPException(status_code=500, detail="Authentication service timeout")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Google token exchange failed: {type(e).__name__}")
             raise HTTPException(status_code=500, detail="Authentication failed")
         except Exception as e:
             logger.error(f"Unexpected error during Google token exchange: {type(e).__name__}")
             raise HTTPException(status_code=500, detail="Authentication failed")
     
-    def _exchange_firebase_token(self, google_id_token: str, request_uri: Optional[str]) -> Dict[str, Any]:
+    async def _exchange_firebase_token(self, google_id_token: str, request_uri: Optional[str]) -> Dict[str, Any]:
         """
         Exchange Google ID token for Firebase token.
         
@@ -186,7 +227,7 @@ class AuthService:
         if not google_id_token:
             raise HTTPException(status_code=500, detail="Authentication failed: Missing Google ID token")
         
-        firebase_token_url = f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithIdp?key={self.settings.firebase_api_key}"
+        firebase_token_url = f"{FIREBASE_SIGN_IN_URL}?key={self.settings.firebase_api_key}"
         
         # Construct the postBody required by Firebase signInWithIdp
         firebase_payload_postbody = f"id_token={google_id_token}&providerId=google.com"
@@ -201,9 +242,10 @@ class AuthService:
         logger.debug("Exchanging Google ID token for Firebase token")
         
         try:
-            response = requests.post(firebase_token_url, data=firebase_payload, timeout=30)
+            async with self._firebase_sem:
+                response = await self._client.post(firebase_token_url, data=firebase_payload)
             response.raise_for_status()
-            firebase_data = response.json()
+            firebase_data = orjson.loads(response.content)
             
             if "idToken" not in firebase_data:
                 logger.error("Firebase token exchange succeeded but no ID token returned")
@@ -215,10 +257,10 @@ class AuthService:
             logger.debug("Firebase token exchange successful")
             return firebase_data
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error("Firebase token exchange timed out")
             raise HTTPException(status_code=500, detail="Authentication service timeout")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Firebase token exchange failed: {type(e).__name__}")
             raise HTTPException(status_code=500, detail="Authentication failed")
         except Exception as e:
@@ -239,15 +281,13 @@ class AuthService:
             return None, None
         
         try:
-            # First attempt - normal decoding
-            try:
-                state_data = json.loads(urllib.parse.unquote(state))
-                logger.debug("State parameter decoded successfully")
-            except json.JSONDecodeError:
-                # Try double decoding for backward compatibility
-                logger.debug("Attempting double-decode of state parameter")
-                state_data = json.loads(urllib.parse.unquote(urllib.parse.unquote(state)))
-                logger.debug("State parameter double-decoded successfully")
+            decoded = urllib.parse.unquote(state)
+            # Still percent-encoded after one pass: double-encoded for backward compatibility
+            if "%" in decoded and not decoded.lstrip().startswith("{"):
+                logger.debug("Double-decoding state parameter")
+                decoded = urllib.parse.unquote(decoded)
+            state_data = orjson.loads(decoded)
+            logger.debug("State parameter decoded successfully")
             
             redirect_uri = state_data.get("redirect_uri")
             callback_url = state_data.get("callback_url")
@@ -279,13 +319,12 @@ class AuthService:
             
             # Construct from redirect_uri
             if redirect_uri:
-                parsed_uri = urllib.parse.urlparse(redirect_uri)
-                constructed_url = f"{parsed_uri.scheme}://{parsed_uri.netloc}/auth/callback"
+                constructed_url = _callback_url_from_redirect_uri(redirect_uri)
                 logger.debug("Constructed callback URL from redirect URI")
                 return constructed_url
             
             # Fallback to request headers
-            if request:
+            if request is not None:
                 host = request.headers.get("host", "")
                 scheme = request.headers.get("x-forwarded-proto", request.url.scheme)
                 fallback_url = f"{scheme}://{host}/auth/callback"
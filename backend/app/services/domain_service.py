@@ -26,15 +26,11 @@ class DomainService:
         self._compile_domain_regex()
     
     def _compile_domain_regex(self) -> None:
-        """Compile the domain regex pattern for validation."""
-        try:
-            self._compiled_regex = re.compile(self.settings.allowed_email_domain_regex)
-            logger.debug("Domain regex compiled successfully")
-        except re.error as e:
-            logger.error(f"Invalid domain regex pattern: {e}")
-            # Fall back to allow all domains
-            self._compiled_regex = re.compile(".*")
-            logger.warning("Using fallback regex to allow all domains")
+        """Load the precompiled domain regex pattern from settings."""
+        self._compiled_regex = self.settings.email_domain_pattern
+        self._matcher = self.settings.email_domain_matcher
+        self._allow_all = not self.is_domain_configured()
+        logger.debug("Domain regex loaded from settings")
     
     def validate_email_domain(self, email: str) -> bool:
         """
@@ -51,12 +47,11 @@ class DomainService:
             return False
         
         # If no regex pattern is set or it's the default ".*", allow all
-        if (not self.settings.allowed_email_domain_regex or 
-            self.settings.allowed_email_domain_regex == ".*"):
+        if self._allow_all:
             return True
         
         try:
-            is_valid = bool(self._compiled_regex.match(email))
+            is_valid = bool(self._matcher(email))
             if not is_valid:
                 logger.info(f"Email domain validation failed for domain pattern")
             return is_valid
@@ -92,10 +87,11 @@ class DomainService:
         Returns:
             Domain part of the email address
         """
-        if not email or "@" not in email:
+        if not email:
             return ""
         
-        return email.split("@")[-1].lower()
+        _, sep, domain = email.rpartition("@")
+        return domain.lower() if sep else ""
     
     def is_domain_configured(self) -> bool:
         """
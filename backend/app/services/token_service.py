@@ -2,13 +2,24 @@
 Token verification and management service.
 """
 import logging
+import threading
+import time
 from typing import Dict, Any
+from cachetools import TTLCache
 from fastapi import HTTPException
 import firebase_admin
 from firebase_admin import auth
 
 logger = logging.getLogger(__name__)
 
+# Verified tokens are reused for at most this many seconds (or until they expire)
+VERIFY_CACHE_TTL = 300
+VERIFY_CACHE_SIZE = 10_000
+
+# Firebase Admin SDK initialization happens once per process
+_firebase_initialized = False
+_firebase_init_lock = threading.Lock()
+
 
 class TokenService:
     """Service for Firebase token verification and management."""
@@ -16,15 +27,24 @@ class TokenService:
     def __init__(self):
         """Initialize token service."""
         self._ensure_firebase_initialized()
+        self._verify_cache: TTLCache = TTLCache(maxsize=VERIFY_CACHE_SIZE, ttl=VERIFY_CACHE_TTL)
+        self._verify_cache_lock = threading.Lock()
     
     def _ensure_firebase_initialized(self) -> None:
         """Ensure Firebase Admin SDK is initialized."""
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            # App not initialized yet
-            firebase_admin.initialize_app()
-            logger.info("Firebase Admin SDK initialized")
+        global _firebase_initialized
+        if _firebase_initialized:
+            return
+        with _firebase_init_lock:
+            if _firebase_initialized:
+                return
+            try:
+                firebase_admin.get_app()
+            except ValueError:
+                # App not initialized yet
+                firebase_admin.initialize_app()
+                logger.info("Firebase Admin SDK initialized")
+            _firebase_initialized = True
     
     def verify_token(self, token: str) -> Dict[str, Any]:
         """
@@ -39,9 +59,21 @@ class TokenService:
         Raises:
             HTTPException: If token verification fails
         """
+        # Key by the token itself: exact-match lookups need no extra hashing step
+        now = time.time()
+        with self._verify_cache_lock:
+            cached = self._verify_cache.get(token)
+        if cached is not None:
+            decoded_token, expires_at = cached
+            if now < expires_at:
+                return decoded_token
+        
         try:
             decoded_token = auth.verify_id_token(token, check_revoked=True)
             logger.debug("Token verification successful")
+            expires_at = min(decoded_token.get("exp", now), now + VERIFY_CACHE_TTL)
+            with self._verify_cache_lock:
+                self._verify_cache[token] = (decoded_token, expires_at)
             return decoded_token
         except auth.ExpiredIdTokenError:
             logger.warning("Token verification failed: token expired")
@@ -56,6 +88,19 @@ class TokenService:
             logger.error(f"Token verification failed: {type(e).__name__}")
             raise HTTPException(status_code=401, detail="Token verification failed")
     
+    def forget(self, token: str) -> None:
+        """
+        Drop a token from this process's verification cache so it is re-verified on next use.
+        
+        This does not revoke the token: it stays valid with Firebase (and in other workers'
+        caches) until it expires or the user's refresh tokens are revoked.
+        
+        Args:
+            token: Firebase ID token to forget
+        """
+        with self._verify_cache_lock:
+            self._verify_cache.pop(token, None)
+    
     def extract_token_from_header(self, authorization: str) -> str:
         """
         Extract token from Authorization header.
@@ -72,18 +117,15 @@ class TokenService:
         if not authorization:
             raise HTTPException(status_code=401, detail="Authorization header missing")
         
-        parts = authorization.split()
+        # Any whitespace separates scheme and token; maxsplit bounds the work on junk headers
+        parts = authorization.split(None, 2)
         if len(parts) != 2 or parts[0].lower() != "bearer":
             raise HTTPException(
                 status_code=401, 
                 detail="Invalid authorization header format. Expected: Bearer <token>"
             )
         
-        token = parts[1]
-        if not token:
-            raise HTTPException(status_code=401, detail="Token cannot be empty")
-        
-        return token
+        return parts[1]
     
     def extract_user_data(self, decoded_token: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -112,12 +154,10 @@ class TokenService:
         Raises:
             HTTPException: If required claims are missing
         """
-        required_claims = ["uid", "email"]
-        missing_claims = [claim for claim in required_claims if not decoded_token.get(claim)]
-        
-        if missing_claims:
-            logger.warning(f"Token missing required claims: {missing_claims}")
-            raise HTTPException(
-                status_code=401, 
-                detail="Token missing required user information"
-            )
+        for claim in ("uid", "email"):
+            if not decoded_token.get(claim):
+                logger.warning("Token missing required claim: %s", claim)
+                raise HTTPException(
+                    status_code=401, 
+                    detail="Token missing required user information"
+                )
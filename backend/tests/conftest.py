@@ -4,6 +4,11 @@ Pytest configuration and fixtures for Auth Gateway tests.
 import pytest
 import os
 from unittest.mock import Mock, patch
+import firebase_admin
+import httpx
+import pytest_asyncio
+import respx
+from firebase_admin import auth as firebase_auth
 
 # Set up test environment variables before any imports
 os.environ.update({
@@ -20,31 +25,21 @@ os.environ.update({
     "ENVIRONMENT": "test"
 })
 
-from fastapi.testclient import TestClient
 from app.config import Settings
-from app.main import app
+from app.services import AuthService, DomainService
+from app.services import token_service as token_service_module
+from app.services.auth_service import FIREBASE_SIGN_IN_URL, GOOGLE_TOKEN_URL
 
 
-@pytest.fixture
-def test_settings():
-    """Test settings with safe values."""
-    # Mock environment variables for testing
-    import os
-    os.environ.update({
-        "FIREBASE_API_KEY": "test-api-key",
-        "FIREBASE_AUTH_DOMAIN": "test-project.firebaseapp.com", 
-        "FIREBASE_PROJECT_ID": "test-project",
-        "GOOGLE_CLIENT_ID": "test-client-id",
-        "GOOGLE_CLIENT_SECRET": "test-client-secret",
-        "GATEWAY_PUBLIC_URL": "https://test-gateway.com",
-        "AUTH_REDIRECT_URL": "https://test-client.com/callback",
-        "ALLOWED_EMAIL_DOMAIN_REGEX": ".*@example\.com$",
-        "CORS_ALLOWED_ORIGINS": "https://test-client.com",
-        "LOG_LEVEL": "DEBUG",
-        "ENVIRONMENT": "test"
-    })
+class FrozenSettings(Settings):
+    """Settings that reject attribute assignment, for fixtures shared across tests."""
     
-    return Settings(
+    model_config = {**Settings.model_config, "frozen": True}
+
+
+def build_test_settings(settings_cls: type[Settings] = Settings) -> Settings:
+    """Build settings with safe test values."""
+    return settings_cls(
         firebase_api_key="test-api-key",
         firebase_auth_domain="test-project.firebaseapp.com",
         firebase_project_id="test-project",
@@ -59,18 +54,60 @@ def test_settings():
     )
 
 
+@pytest.fixture(scope="module")
+def frozen_settings():
+    """Immutable test settings, validated once per module for tests that don't mutate them."""
+    return build_test_settings(FrozenSettings)
+
+
 @pytest.fixture
-def client():
-    """Test client for FastAPI app."""
-    return TestClient(app)
+def test_settings(frozen_settings):
+    """Mutable copy of the test settings for tests that change individual values."""
+    # model_construct skips re-validation; fields were already validated on frozen_settings
+    return Settings.model_construct(**frozen_settings.model_dump())
+
+
+@pytest.fixture(scope="module")
+def domain_service(frozen_settings):
+    """DomainService shared by tests that don't mutate settings."""
+    return DomainService(frozen_settings)
+
+
+@pytest.fixture(scope="module")
+def regex_domain_service(request):
+    """DomainService for the domain regex supplied through indirect parametrization."""
+    settings = build_test_settings()
+    settings.allowed_email_domain_regex = request.param
+    return DomainService(settings)
+
+
+@pytest.fixture(scope="module")
+def auth_service(frozen_settings):
+    """AuthService shared by tests that don't mutate settings."""
+    return AuthService(frozen_settings)
+
+
+@pytest.fixture(scope="session")
+def app():
+    """FastAPI app, imported on first use so collection doesn't build it."""
+    from app.main import app as fastapi_app
+    return fastapi_app
+
+
+@pytest_asyncio.fixture
+async def client(app):
+    """Async test client calling the FastAPI app in-process, without a portal thread."""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as test_client:
+        yield test_client
 
 
 @pytest.fixture
 def mock_firebase_admin():
     """Mock Firebase Admin SDK."""
-    with patch('firebase_admin.initialize_app') as mock_init, \
-         patch('firebase_admin.get_app') as mock_get_app, \
-         patch('firebase_admin.auth.verify_id_token') as mock_verify:
+    with patch.object(token_service_module, "_firebase_initialized", False), \
+         patch.object(firebase_admin, "initialize_app") as mock_init, \
+         patch.object(firebase_admin, "get_app") as mock_get_app, \
+         patch.object(firebase_auth, "verify_id_token") as mock_verify:
         
         # Mock app initialization
         mock_get_app.side_effect = ValueError("No app")  # First call fails
@@ -92,39 +129,24 @@ def mock_firebase_admin():
 
 
 @pytest.fixture
-def mock_requests():
-    """Mock requests library for external API calls."""
-    with patch('requests.post') as mock_post:
-        # Mock Google token exchange response
-        google_response = Mock()
-        google_response.ok = True
-        google_response.json.return_value = {
-            "id_token": "mock-google-id-token",
-            "access_token": "mock-access-token"
-        }
-        google_response.raise_for_status.return_value = None
-        
-        # Mock Firebase token exchange response  
-        firebase_response = Mock()
-        firebase_response.ok = True
-        firebase_response.json.return_value = {
-            "idToken": "mock-firebase-id-token",
-            "refreshToken": "mock-refresh-token"
-        }
-        firebase_response.raise_for_status.return_value = None
-        
-        # Configure mock to return different responses based on URL
-        def side_effect(*args, **kwargs):
-            url = args[0] if args else kwargs.get('url', '')
-            if 'oauth2.googleapis.com' in url:
-                return google_response
-            elif 'identitytoolkit.googleapis.com' in url:
-                return firebase_response
-            else:
-                return Mock()
-        
-        mock_post.side_effect = side_effect
-        yield mock_post
+def http_mock():
+    """Route table for outbound HTTP client requests; unmatched requests fail the test."""
+    with respx.mock(assert_all_called=False) as router:
+        yield router
+
+
+@pytest.fixture
+def mock_requests(http_mock):
+    """Mock Google and Firebase token exchange responses for external API calls."""
+    http_mock.post(GOOGLE_TOKEN_URL).respond(json={
+        "id_token": "mock-google-id-token",
+        "access_token": "mock-access-token"
+    })
+    http_mock.post(url__startswith=FIREBASE_SIGN_IN_URL).respond(json={
+        "idToken": "mock-firebase-id-token",
+        "refreshToken": "mock-refresh-token"
+    })
+    return http_mock
 
 
 @pytest.fixture
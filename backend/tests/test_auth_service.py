@@ -4,39 +4,64 @@ Tests for AuthService.
 import pytest
 import json
 import urllib.parse
-from unittest.mock import Mock, patch
+from types import SimpleNamespace
+from unittest.mock import create_autospec, patch
 from fastapi import HTTPException, Request
-import requests
+import httpx
+from starlette.datastructures import Headers
 
-from app.services.auth_service import AuthService
+from app.routes.auth import get_auth_service
+from app.services import auth_service as auth_service_module
+from app.services.auth_service import AuthService, FIREBASE_SIGN_IN_URL, GOOGLE_TOKEN_URL
+
+# Route every outbound HTTP call through respx so no test can reach the network
+pytestmark = pytest.mark.usefixtures("http_mock")
+
+_STATE_DATA = {"redirect_uri": "https://client.com", "callback_url": "https://gateway.com/callback"}
+_STATE_SINGLE = urllib.parse.quote(json.dumps(_STATE_DATA))
+_STATE_DOUBLE = urllib.parse.quote(_STATE_SINGLE)
+
+_FORWARDED_HEADERS = Headers({"host": "gateway.com", "x-forwarded-proto": "https"})
+
+
+@pytest.fixture(scope="module")
+def decoded_auth_url(auth_service):
+    """Google auth URL for a fixed redirect URI, parsed once for the module."""
+    url = auth_service.create_google_auth_url("https://client.com/callback")
+    parsed = urllib.parse.urlparse(url)
+    query_params = urllib.parse.parse_qs(parsed.query)
+    state = json.loads(urllib.parse.unquote(query_params["state"][0]))
+    return SimpleNamespace(url=url, parsed=parsed, query_params=query_params, state=state)
 
 
 class TestAuthService:
     """Test cases for AuthService."""
     
-    def test_init(self, test_settings):
+    def test_init(self, frozen_settings):
         """Test AuthService initialization."""
-        service = AuthService(test_settings)
-        assert service.settings == test_settings
+        service = AuthService(frozen_settings)
+        assert service.settings == frozen_settings
+    
+    def test_init_with_shared_http_client(self, frozen_settings):
+        """Test AuthService reuses a provided HTTP client."""
+        http_client = httpx.AsyncClient()
+        service = AuthService(frozen_settings, http_client)
+        assert service._client is http_client
     
-    def test_create_google_auth_url_success(self, test_settings):
+    def test_create_google_auth_url_success(self, decoded_auth_url):
         """Test successful Google auth URL creation."""
-        service = AuthService(test_settings)
-        
-        url = service.create_google_auth_url("https://client.com/callback")
-        
-        assert "accounts.google.com/o/oauth2/auth" in url
-        assert "client_id=test-client-id" in url
-        assert "response_type=code" in url
-        assert "scope=email%20profile" in url
-        assert "redirect_uri=" in url
-        assert "state=" in url
+        parsed, query_params = decoded_auth_url.parsed, decoded_auth_url.query_params
+        
+        assert (parsed.scheme, parsed.netloc, parsed.path) == ("https", "accounts.google.com", "/o/oauth2/auth")
+        assert query_params["client_id"] == ["test-client-id"]
+        assert query_params["response_type"] == ["code"]
+        assert query_params["scope"] == ["email profile"]
+        assert query_params["redirect_uri"] == ["https://test-gateway.com/auth/callback"]
+        assert "state" in query_params
     
-    def test_create_google_auth_url_with_default_redirect(self, test_settings):
+    def test_create_google_auth_url_with_default_redirect(self, auth_service):
         """Test Google auth URL creation with default redirect URI."""
-        service = AuthService(test_settings)
-        
-        url = service.create_google_auth_url()
+        url = auth_service.create_google_auth_url()
         
         # Should use default redirect URI from settings
         assert "accounts.google.com/o/oauth2/auth" in url
@@ -46,253 +71,191 @@ class TestAuthService:
         test_settings.firebase_api_key = ""
         service = AuthService(test_settings)
         
-        with pytest.raises(HTTPException) as exc:
+        with pytest.raises(HTTPException, match="Authentication configuration missing") as exc:
             service.create_google_auth_url("https://client.com/callback")
         
         assert exc.value.status_code == 500
-        assert "Authentication configuration missing" in exc.value.detail
     
     def test_create_google_auth_url_no_redirect_uri(self, test_settings):
         """Test Google auth URL creation without redirect URI."""
         test_settings.auth_redirect_url = None
         service = AuthService(test_settings)
         
-        with pytest.raises(HTTPException) as exc:
+        with pytest.raises(HTTPException, match="Client redirect URI not provided") as exc:
             service.create_google_auth_url()
         
         assert exc.value.status_code == 400
-        assert "Client redirect URI not provided" in exc.value.detail
     
     def test_create_google_auth_url_no_gateway_url(self, test_settings):
         """Test Google auth URL creation without gateway public URL."""
         test_settings.gateway_public_url = ""
         service = AuthService(test_settings)
         
-        with pytest.raises(HTTPException) as exc:
+        with pytest.raises(HTTPException, match="Gateway public URL not configured") as exc:
             service.create_google_auth_url("https://client.com/callback")
         
         assert exc.value.status_code == 500
-        assert "Gateway public URL not configured" in exc.value.detail
     
-    def test_exchange_code_for_token_success(self, test_settings, mock_requests):
+    @pytest.mark.asyncio
+    async def test_exchange_code_for_token_success(self, auth_service, mock_requests):
         """Test successful code exchange for token."""
-        service = AuthService(test_settings)
-        
-        result = service.exchange_code_for_token("auth-code", "https://callback.com")
+        result = await auth_service.exchange_code_for_token("auth-code", "https://callback.com")
         
         assert result == {"idToken": "mock-firebase-id-token", "refreshToken": "mock-refresh-token"}
-        assert mock_requests.call_count == 2  # Google + Firebase calls
+        google_call, firebase_call = mock_requests.calls  # Google + Firebase calls, in order
+        assert str(google_call.request.url) == GOOGLE_TOKEN_URL
+        assert str(firebase_call.request.url).startswith(FIREBASE_SIGN_IN_URL)
     
-    def test_exchange_code_for_token_missing_config(self, test_settings):
+    @pytest.mark.asyncio
+    async def test_exchange_code_for_token_missing_config(self, test_settings):
         """Test code exchange with missing configuration."""
         test_settings.google_client_secret = ""
         service = AuthService(test_settings)
         
-        with pytest.raises(HTTPException) as exc:
-            service.exchange_code_for_token("auth-code", "https://callback.com")
+        with pytest.raises(HTTPException, match="OAuth configuration missing") as exc:
+            await service.exchange_code_for_token("auth-code", "https://callback.com")
         
         assert exc.value.status_code == 500
-        assert "OAuth configuration missing" in exc.value.detail
     
-    def test_exchange_google_code_success(self, test_settings, mock_requests):
+    @pytest.mark.asyncio
+    async def test_exchange_google_code_success(self, auth_service, mock_requests):
         """Test successful Google code exchange."""
-        service = AuthService(test_settings)
-        
-        result = service._exchange_google_code("auth-code", "https://callback.com")
+        result = await auth_service._exchange_google_code("auth-code", "https://callback.com")
         
         assert result == {"id_token": "mock-google-id-token", "access_token": "mock-access-token"}
     
-    def test_exchange_google_code_no_id_token(self, test_settings):
-        """Test Google code exchange when no ID token is returned."""
-        service = AuthService(test_settings)
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("exchange, token, route, upstream, detail", [
+        pytest.param("_exchange_google_code", "auth-code", {"url": GOOGLE_TOKEN_URL},
+                     {"access_token": "token"}, "Authentication failed", id="google-no-id-token"),
+        pytest.param("_exchange_google_code", "auth-code", {"url": GOOGLE_TOKEN_URL},
+                     httpx.ReadTimeout, "Authentication service timeout", id="google-timeout"),
+        pytest.param("_exchange_google_code", "auth-code", {"url": GOOGLE_TOKEN_URL},
+                     httpx.ConnectError, "Authentication failed", id="google-request-error"),
+        pytest.param("_exchange_firebase_token", "google-id-token", {"url__startswith": FIREBASE_SIGN_IN_URL},
+                     {"refreshToken": "token"}, "Authentication failed", id="firebase-no-id-token"),
+        pytest.param("_exchange_firebase_token", "", None,
+                     None, "Missing Google ID token", id="firebase-missing-google-token"),
+    ])
+    async def test_exchange_errors(self, auth_service, http_mock, exchange, token, route, upstream, detail):
+        """Test token exchange failure modes raise a 500 with the expected detail."""
+        if route is not None:
+            upstream_route = http_mock.post(**route)
+            if isinstance(upstream, dict):
+                upstream_route.respond(json=upstream)  # Response missing the expected ID token
+            else:
+                upstream_route.mock(side_effect=upstream)
+        
+        with pytest.raises(HTTPException, match=detail) as exc:
+            await getattr(auth_service, exchange)(token, "https://callback.com")
         
-        with patch('requests.post') as mock_post:
-            mock_response = Mock()
-            mock_response.ok = True
-            mock_response.json.return_value = {"access_token": "token"}  # No id_token
-            mock_response.raise_for_status.return_value = None
-            mock_post.return_value = mock_response
-            
-            with pytest.raises(HTTPException) as exc:
-                service._exchange_google_code("auth-code", "https://callback.com")
-            
-            assert exc.value.status_code == 500
-            assert "Authentication failed" in exc.value.detail
-    
-    def test_exchange_google_code_timeout(self, test_settings):
-        """Test Google code exchange with timeout."""
-        service = AuthService(test_settings)
-        
-        with patch('requests.post') as mock_post:
-            mock_post.side_effect = requests.exceptions.Timeout()
-            
-            with pytest.raises(HTTPException) as exc:
-                service._exchange_google_code("auth-code", "https://callback.com")
-            
-            assert exc.value.status_code == 500
-            assert "Authentication service timeout" in exc.value.detail
-    
-    def test_exchange_google_code_request_error(self, test_settings):
-        """Test Google code exchange with request error."""
-        service = AuthService(test_settings)
-        
-        with patch('requests.post') as mock_post:
-            mock_post.side_effect = requests.exceptions.RequestException()
-            
-            with pytest.raises(HTTPException) as exc:
-                service._exchange_google_code("auth-code", "https://callback.com")
-            
-            assert exc.value.status_code == 500
-            assert "Authentication failed" in exc.value.detail
+        assert exc.value.status_code == 500
     
-    def test_exchange_firebase_token_success(self, test_settings):
+    @pytest.mark.asyncio
+    async def test_exchange_firebase_token_success(self, auth_service, http_mock):
         """Test successful Firebase token exchange."""
-        service = AuthService(test_settings)
-        
-        with patch('requests.post') as mock_post:
-            mock_response = Mock()
-            mock_response.ok = True
-            mock_response.json.return_value = {"idToken": "firebase-token"}
-            mock_response.raise_for_status.return_value = None
-            mock_post.return_value = mock_response
-            
-            result = service._exchange_firebase_token("google-id-token", "https://callback.com")
-            
-            assert result == {"idToken": "firebase-token"}
-    
-    def test_exchange_firebase_token_missing_token(self, test_settings):
-        """Test Firebase token exchange with missing Google ID token."""
-        service = AuthService(test_settings)
+        http_mock.post(url__startswith=FIREBASE_SIGN_IN_URL).respond(json={"idToken": "firebase-token"})
         
-        with pytest.raises(HTTPException) as exc:
-            service._exchange_firebase_token("", "https://callback.com")
+        result = await auth_service._exchange_firebase_token("google-id-token", "https://callback.com")
         
-        assert exc.value.status_code == 500
-        assert "Missing Google ID token" in exc.value.detail
-    
-    def test_exchange_firebase_token_no_id_token(self, test_settings):
-        """Test Firebase token exchange when no ID token is returned."""
-        service = AuthService(test_settings)
-        
-        with patch('requests.post') as mock_post:
-            mock_response = Mock()
-            mock_response.ok = True
-            mock_response.json.return_value = {"refreshToken": "token"}  # No idToken
-            mock_response.raise_for_status.return_value = None
-            mock_post.return_value = mock_response
-            
-            with pytest.raises(HTTPException) as exc:
-                service._exchange_firebase_token("google-id-token", "https://callback.com")
-            
-            assert exc.value.status_code == 500
-            assert "Authentication failed" in exc.value.detail
+        assert result == {"idToken": "firebase-token"}
     
-    def test_parse_state_parameter_success(self, test_settings):
+    def test_parse_state_parameter_success(self, auth_service):
         """Test successful state parameter parsing."""
-        service = AuthService(test_settings)
-        
-        state_data = {"redirect_uri": "https://client.com", "callback_url": "https://gateway.com/callback"}
-        state = urllib.parse.quote(json.dumps(state_data))
-        
-        redirect_uri, callback_url = service.parse_state_parameter(state)
+        redirect_uri, callback_url = auth_service.parse_state_parameter(_STATE_SINGLE)
         
         assert redirect_uri == "https://client.com"
         assert callback_url == "https://gateway.com/callback"
     
-    def test_parse_state_parameter_double_encoded(self, test_settings):
+    def test_parse_state_parameter_double_encoded(self, auth_service):
         """Test state parameter parsing with double encoding."""
-        service = AuthService(test_settings)
-        
-        state_data = {"redirect_uri": "https://client.com", "callback_url": "https://gateway.com/callback"}
-        # Double encode
-        state = urllib.parse.quote(urllib.parse.quote(json.dumps(state_data)))
-        
-        redirect_uri, callback_url = service.parse_state_parameter(state)
+        redirect_uri, callback_url = auth_service.parse_state_parameter(_STATE_DOUBLE)
         
         assert redirect_uri == "https://client.com"
         assert callback_url == "https://gateway.com/callback"
     
-    def test_parse_state_parameter_none(self, test_settings):
+    def test_parse_state_parameter_none(self, auth_service):
         """Test state parameter parsing with None."""
-        service = AuthService(test_settings)
-        
-        redirect_uri, callback_url = service.parse_state_parameter(None)
+        redirect_uri, callback_url = auth_service.parse_state_parameter(None)
         
         assert redirect_uri is None
         assert callback_url is None
     
-    def test_parse_state_parameter_invalid_json(self, test_settings):
+    def test_parse_state_parameter_invalid_json(self, auth_service):
         """Test state parameter parsing with invalid JSON."""
-        service = AuthService(test_settings)
-        
-        redirect_uri, callback_url = service.parse_state_parameter("invalid-json")
+        redirect_uri, callback_url = auth_service.parse_state_parameter("invalid-json")
         
         assert redirect_uri is None
         assert callback_url is None
     
-    def test_construct_callback_url_from_callback_url(self, test_settings):
+    def test_construct_callback_url_from_callback_url(self, auth_service):
         """Test callback URL construction using callback URL from state."""
-        service = AuthService(test_settings)
-        
-        url = service.construct_callback_url(
+        url = auth_service.construct_callback_url(
             "https://client.com", 
             "https://gateway.com/auth/callback"
         )
         
         assert url == "https://gateway.com/auth/callback"
     
-    def test_construct_callback_url_from_redirect_uri(self, test_settings):
+    def test_construct_callback_url_from_redirect_uri(self, auth_service):
         """Test callback URL construction using redirect URI."""
-        service = AuthService(test_settings)
-        
-        url = service.construct_callback_url("https://client.com/callback", None)
+        url = auth_service.construct_callback_url("https://client.com/callback", None)
         
         assert url == "https://client.com/auth/callback"
     
-    def test_construct_callback_url_from_request(self, test_settings):
+    def test_construct_callback_url_from_redirect_uri_with_query(self, auth_service):
+        """Test callback URL construction drops the redirect URI's query and fragment."""
+        assert auth_service.construct_callback_url("https://client.com?next=1", None) == "https://client.com/auth/callback"
+        assert auth_service.construct_callback_url("http://client.com:8080#top", None) == "http://client.com:8080/auth/callback"
+    
+    def test_construct_callback_url_from_request(self, auth_service):
         """Test callback URL construction using request headers."""
-        service = AuthService(test_settings)
+        mock_request = create_autospec(Request, instance=True)
+        mock_request.headers = _FORWARDED_HEADERS
         
-        mock_request = Mock()
-        mock_request.headers = {"host": "gateway.com", "x-forwarded-proto": "https"}
-        
-        url = service.construct_callback_url(None, None, mock_request)
+        url = auth_service.construct_callback_url(None, None, mock_request)
         
         assert url == "https://gateway.com/auth/callback"
     
-    def test_construct_callback_url_fallback(self, test_settings):
+    def test_construct_callback_url_fallback(self, auth_service):
         """Test callback URL construction with fallback."""
-        service = AuthService(test_settings)
-        
-        url = service.construct_callback_url(None, None, None)
+        url = auth_service.construct_callback_url(None, None, None)
         
         assert url == "https://test-project.firebaseapp.com/auth/callback"
     
-    def test_construct_callback_url_error_handling(self, test_settings):
+    def test_construct_callback_url_error_handling(self, auth_service):
         """Test callback URL construction with error handling."""
-        service = AuthService(test_settings)
-        
-        # Mock an error in URL parsing
-        with patch('urllib.parse.urlparse') as mock_parse:
-            mock_parse.side_effect = Exception("Parse error")
-            
-            url = service.construct_callback_url("https://client.com", None)
+        # Mock an error in URL parsing, patched only where auth_service looks it up
+        with patch.object(auth_service_module, "urlparse", side_effect=Exception("Parse error")):
+            # Without a scheme separator the URI is handed to urlparse
+            url = auth_service.construct_callback_url("client.com", None)
             
             # Should fall back to Firebase domain
             assert url == "https://test-project.firebaseapp.com/auth/callback"
     
-    def test_state_parameter_encoding_in_url(self, test_settings):
+    def test_state_parameter_encoding_in_url(self, decoded_auth_url):
         """Test that state parameter is properly encoded in auth URL."""
-        service = AuthService(test_settings)
+        state_data = decoded_auth_url.state
+        assert state_data['redirect_uri'] == "https://client.com/callback"
+        assert state_data['callback_url'] == "https://test-gateway.com/auth/callback"
+
+
+class TestGetAuthService:
+    """Test cases for the auth service dependency."""
+    
+    def test_uses_lifespan_http_client(self):
+        """Test that the service shares the HTTP client opened by the app's lifespan."""
+        http_client = httpx.AsyncClient()
+        request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(http_client=http_client)))
         
-        url = service.create_google_auth_url("https://client.com/callback")
+        service = get_auth_service(request)
         
-        # Extract state parameter from URL
-        parsed = urllib.parse.urlparse(url)
-        query_params = urllib.parse.parse_qs(parsed.query)
-        state_param = query_params['state'][0]
+        assert service._client is http_client
+        assert get_auth_service(request) is service
+    
+    def test_requires_lifespan_http_client(self):
+        """Test that a missing lifespan client fails instead of creating one that is never closed."""
+        request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace()))
         
-        # Decode and verify state parameter
-        state_data = json.loads(urllib.parse.unquote(state_param))
-        assert state_data['redirect_uri'] == "https://client.com/callback"
-        assert state_data['callback_url'] == "https://test-gateway.com/auth/callback"
+        with pytest.raises(RuntimeError, match="HTTP client not initialized"):
+            get_auth_service(request)
@@ -2,19 +2,41 @@
 Tests for DomainService.
 """
 import pytest
-from unittest.mock import patch, Mock
+import re
+from unittest.mock import create_autospec
 from fastapi import HTTPException
 
+from app.config.settings import _ALLOW_ALL_PATTERN
 from app.services.domain_service import DomainService
 
+_MULTI_DOMAIN_REGEX = r".*@(example\.com|test\.org|subdomain\.example\.com)$"
+_MIXED_CASE_REGEX = r".*@Example\.com$"
+# Addresses on which str methods and the IGNORECASE | ASCII domain regex could disagree
+_ADVERSARIAL_EMAILS = [
+    "user@example.com",
+    "example.com",
+    "userexample.com",
+    "a@b@example.com",
+    "user@example.com@evil.org",
+    "user\n@example.com",
+    "user@example.com\n",
+    "user@\u212ak.com",
+    "user@\u212a.com",
+    "user\n@k.com",
+    "user@KK.com",
+    "\u00fcser@example.com",
+    "user@example\u0130com",
+    "",
+]
+
 
 class TestDomainService:
     """Test cases for DomainService."""
     
-    def test_init_with_valid_regex(self, test_settings):
+    def test_init_with_valid_regex(self, frozen_settings):
         """Test DomainService initialization with valid regex."""
-        service = DomainService(test_settings)
-        assert service.settings == test_settings
+        service = DomainService(frozen_settings)
+        assert service.settings == frozen_settings
         assert service._compiled_regex is not None
     
     def test_init_with_invalid_regex(self, test_settings):
@@ -23,42 +45,81 @@ class TestDomainService:
         
         service = DomainService(test_settings)
         
-        # Should fall back to allow-all regex
-        assert service._compiled_regex is not None
+        # Should fall back to the shared allow-all regex
+        assert service._compiled_regex is _ALLOW_ALL_PATTERN
         # Should allow all emails when regex is invalid
         assert service.validate_email_domain("test@anydomain.com") is True
     
-    def test_validate_email_domain_valid(self, test_settings):
-        """Test email domain validation with valid domain."""
-        service = DomainService(test_settings)
-        
-        result = service.validate_email_domain("user@example.com")
+    def test_compiled_regex_shared_from_settings(self, frozen_settings):
+        """Test that DomainService reuses the regex compiled on settings."""
+        first = DomainService(frozen_settings)
+        second = DomainService(frozen_settings)
+
+        assert first._compiled_regex is frozen_settings.email_domain_pattern
+        assert second._compiled_regex is first._compiled_regex
+
+    def test_literal_domain_pattern_skips_regex(self, frozen_settings):
+        """Test that a literal domain pattern skips the regex."""
+        service = DomainService(frozen_settings)
         
-        assert result is True
+        assert service._matcher != frozen_settings.email_domain_pattern.fullmatch
+        assert service.validate_email_domain("user@example.com") is True
+        assert service.validate_email_domain("user@example.com.evil.org") is False
     
-    def test_validate_email_domain_invalid(self, test_settings):
-        """Test email domain validation with invalid domain."""
+    def test_domain_allowlist_pattern_skips_regex(self, test_settings):
+        """Test that an alternation of literal domains is checked as a set."""
+        test_settings.allowed_email_domain_regex = r"^.*@(example\.com|test\.org)$"
         service = DomainService(test_settings)
         
-        result = service.validate_email_domain("user@invalid.org")
-        
-        assert result is False
+        assert service._matcher != test_settings.email_domain_pattern.fullmatch
+        assert service.validate_email_domain("user@TEST.org") is True
+        assert service.validate_email_domain("user@sub.example.com") is False
+        assert service.validate_email_domain("user@example.org") is False
     
-    def test_validate_email_domain_empty_email(self, test_settings):
-        """Test email domain validation with empty email."""
+    def test_literal_suffix_pattern_uses_endswith(self, test_settings):
+        """Test that a literal suffix without an @ is checked with endswith."""
+        test_settings.allowed_email_domain_regex = r".*example\.com$"
         service = DomainService(test_settings)
         
-        result = service.validate_email_domain("")
-        
-        assert result is False
+        assert service._matcher != test_settings.email_domain_pattern.fullmatch
+        assert service.validate_email_domain("user@sub.example.com") is True
+        assert service.validate_email_domain("user@example.org") is False
     
-    def test_validate_email_domain_none_email(self, test_settings):
-        """Test email domain validation with None email."""
+    def test_non_literal_pattern_uses_regex(self, test_settings):
+        """Test that patterns with regex metacharacters keep using the regex."""
+        test_settings.allowed_email_domain_regex = r".*@(example|test)\.com$"
         service = DomainService(test_settings)
         
-        result = service.validate_email_domain(None)
+        assert service._matcher == test_settings.email_domain_pattern.fullmatch
+        assert service.validate_email_domain("user@test.com") is True
+    
+    @pytest.mark.parametrize("email", _ADVERSARIAL_EMAILS)
+    def test_literal_suffix_agrees_with_regex(self, test_settings, email):
+        """Test that the endswith check gives the regex's answer on unusual addresses."""
+        test_settings.allowed_email_domain_regex = r".*k\.com$"
         
-        assert result is False
+        assert bool(test_settings.email_domain_matcher(email)) is bool(
+            test_settings.email_domain_pattern.fullmatch(email)
+        )
+    
+    @pytest.mark.parametrize("email", _ADVERSARIAL_EMAILS)
+    def test_domain_allowlist_agrees_with_regex(self, test_settings, email):
+        """Test that the allowlist lookup gives the regex's answer on unusual addresses."""
+        test_settings.allowed_email_domain_regex = r".*@(example\.com|kk\.com)$"
+        
+        assert bool(test_settings.email_domain_matcher(email)) is bool(
+            test_settings.email_domain_pattern.fullmatch(email)
+        )
+    
+    @pytest.mark.parametrize("email, expected", [
+        ("user@example.com", True),
+        ("user@invalid.org", False),
+        ("", False),
+        (None, False),
+    ])
+    def test_validate_email_domain(self, domain_service, email, expected):
+        """Test email domain validation against the configured pattern."""
+        assert domain_service.validate_email_domain(email) is expected
     
     def test_validate_email_domain_allow_all_regex(self, test_settings):
         """Test email domain validation with allow-all regex."""
@@ -68,6 +129,7 @@ class TestDomainService:
         result = service.validate_email_domain("user@anydomain.com")
         
         assert result is True
+        assert service._compiled_regex is _ALLOW_ALL_PATTERN
     
     def test_validate_email_domain_no_regex(self, test_settings):
         """Test email domain validation with no regex configured."""
@@ -77,102 +139,58 @@ class TestDomainService:
         result = service.validate_email_domain("user@anydomain.com")
         
         assert result is True
+        assert service._compiled_regex is _ALLOW_ALL_PATTERN
     
-    def test_validate_email_domain_regex_error(self, test_settings):
+    def test_validate_email_domain_regex_error(self, frozen_settings):
         """Test email domain validation when regex matching fails."""
-        service = DomainService(test_settings)
+        service = DomainService(frozen_settings)
         
-        # Mock the compiled regex to raise an exception when match is called
-        mock_regex = Mock()
-        mock_regex.match.side_effect = Exception("Regex error")
+        # Mock the compiled regex to raise an exception when it is applied
+        mock_regex = create_autospec(re.Pattern, instance=True)
+        mock_regex.fullmatch.side_effect = Exception("Regex error")
         service._compiled_regex = mock_regex
+        service._matcher = mock_regex.fullmatch
         
         result = service.validate_email_domain("user@example.com")
         
         # Should be permissive on error
         assert result is True
     
-    def test_validate_and_raise_success(self, test_settings):
+    def test_validate_and_raise_success(self, domain_service):
         """Test validate_and_raise with valid email."""
-        service = DomainService(test_settings)
-        
         # Should not raise any exception
-        service.validate_and_raise("user@example.com")
+        domain_service.validate_and_raise("user@example.com")
     
-    def test_validate_and_raise_empty_email(self, test_settings):
+    def test_validate_and_raise_empty_email(self, domain_service):
         """Test validate_and_raise with empty email."""
-        service = DomainService(test_settings)
-        
-        with pytest.raises(HTTPException) as exc:
-            service.validate_and_raise("")
+        with pytest.raises(HTTPException, match="Email address is required") as exc:
+            domain_service.validate_and_raise("")
         
         assert exc.value.status_code == 400
-        assert "Email address is required" in exc.value.detail
     
-    def test_validate_and_raise_invalid_domain(self, test_settings):
+    def test_validate_and_raise_invalid_domain(self, domain_service):
         """Test validate_and_raise with invalid domain."""
-        service = DomainService(test_settings)
-        
-        with pytest.raises(HTTPException) as exc:
-            service.validate_and_raise("user@invalid.org")
+        with pytest.raises(HTTPException, match="Email domain not allowed") as exc:
+            domain_service.validate_and_raise("user@invalid.org")
         
         assert exc.value.status_code == 403
-        assert "Email domain not allowed" in exc.value.detail
-    
-    def test_get_domain_from_email_success(self, test_settings):
-        """Test domain extraction from valid email."""
-        service = DomainService(test_settings)
-        
-        domain = service.get_domain_from_email("user@example.com")
-        
-        assert domain == "example.com"
-    
-    def test_get_domain_from_email_uppercase(self, test_settings):
-        """Test domain extraction with uppercase domain."""
-        service = DomainService(test_settings)
-        
-        domain = service.get_domain_from_email("user@EXAMPLE.COM")
-        
-        assert domain == "example.com"
-    
-    def test_get_domain_from_email_subdomain(self, test_settings):
-        """Test domain extraction with subdomain."""
-        service = DomainService(test_settings)
-        
-        domain = service.get_domain_from_email("user@mail.example.com")
-        
-        assert domain == "mail.example.com"
-    
-    def test_get_domain_from_email_no_at_symbol(self, test_settings):
-        """Test domain extraction from email without @ symbol."""
-        service = DomainService(test_settings)
-        
-        domain = service.get_domain_from_email("invalid-email")
-        
-        assert domain == ""
-    
-    def test_get_domain_from_email_empty(self, test_settings):
-        """Test domain extraction from empty email."""
-        service = DomainService(test_settings)
-        
-        domain = service.get_domain_from_email("")
-        
-        assert domain == ""
-    
-    def test_get_domain_from_email_multiple_at(self, test_settings):
-        """Test domain extraction from email with multiple @ symbols."""
-        service = DomainService(test_settings)
-        
-        domain = service.get_domain_from_email("user@domain@example.com")
-        
-        # Should return the last part after @
-        assert domain == "example.com"
     
-    def test_is_domain_configured_true(self, test_settings):
+    @pytest.mark.parametrize("email, expected", [
+        ("user@example.com", "example.com"),
+        ("user@EXAMPLE.COM", "example.com"),
+        ("user@mail.example.com", "mail.example.com"),
+        ("invalid-email", ""),
+        ("", ""),
+        # Multiple @ symbols: the last part is the domain
+        ("user@domain@example.com", "example.com"),
+    ])
+    def test_get_domain_from_email(self, domain_service, email, expected):
+        """Test domain extraction from email addresses."""
+        assert domain_service.get_domain_from_email(email) == expected
+    
+    def test_is_domain_configured_true(self, domain_service):
         """Test is_domain_configured when domain restriction is active."""
-        service = DomainService(test_settings)
-        
-        result = service.is_domain_configured()
+        result = domain_service.is_domain_configured()
         
         assert result is True
     
@@ -194,28 +212,27 @@ class TestDomainService:
         
         assert result is False
     
-    def test_complex_domain_regex(self, test_settings):
-        """Test complex domain regex patterns."""
+    @pytest.mark.parametrize("regex_domain_service, email, expected", [
         # Allow multiple specific domains
-        test_settings.allowed_email_domain_regex = r".*@(example\.com|test\.org|subdomain\.example\.com)$"
+        (_MULTI_DOMAIN_REGEX, "user@example.com", True),
+        (_MULTI_DOMAIN_REGEX, "user@test.org", True),
+        (_MULTI_DOMAIN_REGEX, "user@subdomain.example.com", True),
+        (_MULTI_DOMAIN_REGEX, "user@invalid.com", False),
+        (_MULTI_DOMAIN_REGEX, "user@example.org", False),
+        # Email domains are case-insensitive
+        (_MIXED_CASE_REGEX, "user@Example.com", True),
+        (_MIXED_CASE_REGEX, "user@example.com", True),
+        (_MIXED_CASE_REGEX, "user@EXAMPLE.COM", True),
+        (_MIXED_CASE_REGEX, "user@example.org", False),
+    ], indirect=["regex_domain_service"])
+    def test_domain_regex_patterns(self, regex_domain_service, email, expected):
+        """Test complex and case-insensitive domain regex patterns."""
+        assert regex_domain_service.validate_email_domain(email) is expected
+    
+    def test_domain_regex_must_match_whole_email(self, test_settings):
+        """Test that a pattern without $ cannot be satisfied by a prefix."""
+        test_settings.allowed_email_domain_regex = r".*@(example|test)\.com"
         service = DomainService(test_settings)
         
-        # Valid domains
         assert service.validate_email_domain("user@example.com") is True
-        assert service.validate_email_domain("user@test.org") is True
-        assert service.validate_email_domain("user@subdomain.example.com") is True
-        
-        # Invalid domains
-        assert service.validate_email_domain("user@invalid.com") is False
-        assert service.validate_email_domain("user@example.org") is False
-    
-    def test_case_sensitive_domain_regex(self, test_settings):
-        """Test case-sensitive domain regex patterns."""
-        # Case-sensitive regex
-        test_settings.allowed_email_domain_regex = r".*@Example\.com$"
-        service = DomainService(test_settings)
-        
-        # Should match case exactly
-        assert service.validate_email_domain("user@Example.com") is True
-        assert service.validate_email_domain("user@example.com") is False
-        assert service.validate_email_domain("user@EXAMPLE.COM") is False
+        assert service.validate_email_domain("user@example.com.evil.org") is False
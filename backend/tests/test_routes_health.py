@@ -2,19 +2,26 @@
 Tests for health check routes.
 """
 import pytest
-from fastapi.testclient import TestClient
+from pydantic import BaseModel, ConfigDict
 
-from app.main import app
 
-client = TestClient(app)
+class HealthPayload(BaseModel):
+    """Expected health response body: exactly these string fields."""
+    
+    model_config = ConfigDict(strict=True, extra="forbid")
+    
+    status: str
+    service: str
+    version: str
 
 
 class TestHealthRoutes:
     """Test cases for health check routes."""
     
-    def test_root_health_check(self):
+    @pytest.mark.asyncio
+    async def test_root_health_check(self, client):
         """Test root health check endpoint."""
-        response = client.get("/")
+        response = await client.get("/")
         
         assert response.status_code == 200
         data = response.json()
@@ -22,9 +29,10 @@ class TestHealthRoutes:
         assert data["service"] == "Auth Gateway"
         assert data["version"] == "1.0.0"
     
-    def test_explicit_health_check(self):
+    @pytest.mark.asyncio
+    async def test_explicit_health_check(self, client):
         """Test explicit health check endpoint."""
-        response = client.get("/health")
+        response = await client.get("/health")
         
         assert response.status_code == 200
         data = response.json()
@@ -32,37 +40,28 @@ class TestHealthRoutes:
         assert data["service"] == "Auth Gateway"
         assert data["version"] == "1.0.0"
     
-    def test_ping_endpoint(self):
+    @pytest.mark.asyncio
+    async def test_ping_endpoint(self, client):
         """Test ping endpoint for load balancers."""
-        response = client.get("/ping")
+        response = await client.get("/ping")
         
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ok"
     
-    def test_health_endpoints_response_format(self):
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("endpoint", ["/", "/health"])
+    async def test_health_endpoints_response_format(self, client, endpoint):
         """Test that health endpoints return proper response format."""
-        endpoints = ["/", "/health"]
+        response = await client.get(endpoint)
         
-        for endpoint in endpoints:
-            response = client.get(endpoint)
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            # Check required fields
-            assert "status" in data
-            assert "service" in data
-            assert "version" in data
-            
-            # Check field types
-            assert isinstance(data["status"], str)
-            assert isinstance(data["service"], str)
-            assert isinstance(data["version"], str)
+        assert response.status_code == 200
+        HealthPayload.model_validate_json(response.content)
     
-    def test_health_endpoints_headers(self):
+    @pytest.mark.asyncio
+    async def test_health_endpoints_headers(self, client):
         """Test that health endpoints return proper headers."""
-        response = client.get("/health")
+        response = await client.get("/health")
         
         assert response.status_code == 200
         assert response.headers["content-type"] == "application/json"
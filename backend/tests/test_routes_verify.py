@@ -0,0 +1,73 @@
+"""
+Tests for token verification routes.
+"""
+import pytest
+from firebase_admin import auth
+from pydantic import ValidationError
+
+from app.main import _verify_user
+from app.models.requests import MAX_BATCH_TOKENS
+from app.routes.auth import get_domain_service, get_token_service
+from app.services import TokenService
+
+
+@pytest.fixture
+def verification_overrides(app, mock_firebase_admin, domain_service, valid_token_claims):
+    """Serve the verification routes with mocked Firebase verification and test settings."""
+    claims_by_token = {
+        "valid-token": valid_token_claims,
+        "other-domain-token": {**valid_token_claims, "email": "user@invalid.org"},
+    }
+
+    def verify_id_token(token, check_revoked):
+        if token == "expired-token":
+            raise auth.ExpiredIdTokenError("Token expired", cause=Exception("Expired"))
+        return claims_by_token[token]
+
+    mock_firebase_admin["verify"].side_effect = verify_id_token
+    token_service = TokenService()
+    app.dependency_overrides[get_token_service] = lambda: token_service
+    app.dependency_overrides[get_domain_service] = lambda: domain_service
+    yield mock_firebase_admin
+    app.dependency_overrides.clear()
+
+
+class TestVerifyTokensRoute:
+    """Test cases for batch token verification."""
+
+    @pytest.mark.asyncio
+    async def test_verify_tokens_reports_each_token_in_order(self, client, verification_overrides):
+        """Test that each token gets its own result, in request order."""
+        response = await client.post("/verify-tokens", json={
+            "tokens": ["valid-token", "expired-token", "other-domain-token"]
+        })
+
+        assert response.status_code == 200
+        valid, expired, other_domain = response.json()["results"]
+        assert valid["user"]["uid"] == "test-uid-123"
+        assert valid["user"]["email"] == "test@example.com"
+        assert valid["status_code"] is None
+        assert expired == {"user": None, "status_code": 401, "message": "Token expired"}
+        assert other_domain == {"user": None, "status_code": 403, "message": "Email domain not allowed"}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("tokens", [[], ["valid-token"] * (MAX_BATCH_TOKENS + 1)])
+    async def test_verify_tokens_rejects_batch_size(self, client, verification_overrides, tokens):
+        """Test that empty and oversized batches are rejected."""
+        response = await client.post("/verify-tokens", json={"tokens": tokens})
+
+        assert response.status_code == 422
+        verification_overrides["verify"].assert_not_called()
+
+
+class TestVerifyUser:
+    """Test cases for the shared token verification path."""
+
+    def test_verified_user_data_is_immutable(self, verification_overrides, domain_service):
+        """Test that the user data shared between verifications can't be modified."""
+        token_service = TokenService()
+        user = _verify_user("valid-token", token_service, domain_service)
+
+        with pytest.raises(ValidationError):
+            user.email = "attacker@example.com"
+        assert _verify_user("valid-token", token_service, domain_service).email == "test@example.com"
@@ -1,9 +1,11 @@
 """
 Tests for TokenService.
 """
+import time
 import pytest
 from unittest.mock import patch, Mock
 from fastapi import HTTPException
+import firebase_admin
 from firebase_admin import auth
 
 from app.services.token_service import TokenService
@@ -19,7 +21,7 @@ class TestTokenService:
     
     def test_init_firebase_already_initialized(self):
         """Test TokenService initialization when Firebase is already initialized."""
-        with patch('firebase_admin.get_app') as mock_get_app:
+        with patch.object(firebase_admin, "get_app") as mock_get_app:
             mock_get_app.return_value = Mock()  # App exists
             
             service = TokenService()
@@ -36,6 +38,41 @@ class TestTokenService:
         assert result == valid_token_claims
         mock_firebase_admin["verify"].assert_called_once_with("valid-token", check_revoked=True)
     
+    def test_verify_token_cached(self, mock_firebase_admin, valid_token_claims):
+        """Test that a verified token is served from cache until its expiry."""
+        valid_token_claims["exp"] = time.time() + 3600
+        mock_firebase_admin["verify"].return_value = valid_token_claims
+        
+        service = TokenService()
+        first = service.verify_token("valid-token")
+        second = service.verify_token("valid-token")
+        
+        assert first == second == valid_token_claims
+        mock_firebase_admin["verify"].assert_called_once()
+    
+    def test_verify_token_expired_cache_entry(self, mock_firebase_admin, valid_token_claims):
+        """Test that a cached token past its expiry is verified again."""
+        # Fixture claims expired long ago
+        mock_firebase_admin["verify"].return_value = valid_token_claims
+        
+        service = TokenService()
+        service.verify_token("valid-token")
+        service.verify_token("valid-token")
+        
+        assert mock_firebase_admin["verify"].call_count == 2
+    
+    def test_forget_drops_cached_token(self, mock_firebase_admin, valid_token_claims):
+        """Test that forgetting a token forces re-verification."""
+        valid_token_claims["exp"] = time.time() + 3600
+        mock_firebase_admin["verify"].return_value = valid_token_claims
+        
+        service = TokenService()
+        service.verify_token("valid-token")
+        service.forget("valid-token")
+        service.verify_token("valid-token")
+        
+        assert mock_firebase_admin["verify"].call_count == 2
+    
     def test_verify_token_expired(self, mock_firebase_admin):
         """Test token verification with expired token."""
         mock_firebase_admin["verify"].side_effect = auth.ExpiredIdTokenError("Token expired", cause=Exception("Expired"))
@@ -92,35 +129,51 @@ class TestTokenService:
         
         assert token == "valid-token-123"
     
+    @pytest.mark.parametrize("header", [
+        "Bearer\tvalid-token-123",
+        "bearer  valid-token-123",
+        " Bearer valid-token-123\r\n",
+    ])
+    def test_extract_token_from_header_any_whitespace(self, header):
+        """Test that scheme and token may be separated by any whitespace."""
+        service = TokenService()
+        
+        assert service.extract_token_from_header(header) == "valid-token-123"
+    
+    @pytest.mark.parametrize("header", ["Bearer", "Bearer a b", "Bearer\ta\tb", "Basic valid-token-123"])
+    def test_extract_token_from_header_rejects_malformed(self, header):
+        """Test that headers without exactly one bearer token are rejected."""
+        service = TokenService()
+        
+        with pytest.raises(HTTPException, match="Invalid authorization header format"):
+            service.extract_token_from_header(header)
+    
     def test_extract_token_from_header_missing(self):
         """Test token extraction with missing header."""
         service = TokenService()
         
-        with pytest.raises(HTTPException) as exc:
+        with pytest.raises(HTTPException, match="Authorization header missing") as exc:
             service.extract_token_from_header(None)
         
         assert exc.value.status_code == 401
-        assert "Authorization header missing" in exc.value.detail
     
     def test_extract_token_from_header_invalid_format(self):
         """Test token extraction with invalid header format."""
         service = TokenService()
         
-        with pytest.raises(HTTPException) as exc:
+        with pytest.raises(HTTPException, match="Invalid authorization header format") as exc:
             service.extract_token_from_header("Invalid format")
         
         assert exc.value.status_code == 401
-        assert "Invalid authorization header format" in exc.value.detail
     
     def test_extract_token_from_header_empty_token(self):
         """Test token extraction with empty token."""
         service = TokenService()
         
-        with pytest.raises(HTTPException) as exc:
+        with pytest.raises(HTTPException, match="Invalid authorization header format") as exc:
             service.extract_token_from_header("Bearer ")
         
         assert exc.value.status_code == 401
-        assert "Invalid authorization header format" in exc.value.detail
     
     def test_extract_user_data(self, valid_token_claims):
         """Test user data extraction from token claims."""
@@ -164,11 +217,10 @@ class TestTokenService:
         
         invalid_claims = {"email": "test@example.com"}
         
-        with pytest.raises(HTTPException) as exc:
+        with pytest.raises(HTTPException, match="Token missing required user information") as exc:
             service.validate_token_claims(invalid_claims)
         
         assert exc.value.status_code == 401
-        assert "Token missing required user information" in exc.value.detail
     
     def test_validate_token_claims_missing_email(self):
         """Test token claims validation with missing email."""
@@ -176,11 +228,10 @@ class TestTokenService:
         
         invalid_claims = {"uid": "test-uid-123"}
         
-        with pytest.raises(HTTPException) as exc:
+        with pytest.raises(HTTPException, match="Token missing required user information") as exc:
             service.validate_token_claims(invalid_claims)
         
         assert exc.value.status_code == 401
-        assert "Token missing required user information" in exc.value.detail
     
     def test_validate_token_claims_empty_values(self):
         """Test token claims validation with empty required values."""
@@ -188,8 +239,7 @@ class TestTokenService:
         
         invalid_claims = {"uid": "", "email": ""}
         
-        with pytest.raises(HTTPException) as exc:
+        with pytest.raises(HTTPException, match="Token missing required user information") as exc:
             service.validate_token_claims(invalid_claims)
         
         assert exc.value.status_code == 401
-        assert "Token missing required user information" in exc.value.detail
@@ -4,6 +4,8 @@ FastAPI Auth Gateway Client Example - Updated with Python SDK
 This example demonstrates how to integrate the Auth Gateway Python SDK
 with a FastAPI application, showing the dramatic reduction in boilerplate code.
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends, Request
 from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
@@ -12,12 +14,6 @@ from fastapi.templating import Jinja2Templates
 from auth_gateway_sdk import UserData
 from auth_gateway_sdk.integrations.fastapi import AuthGatewayFastAPI
 
-# Initialize FastAPI app
-app = FastAPI(title="FastAPI Auth Gateway Client (SDK Example)")
-
-# Initialize templates
-templates = Jinja2Templates(directory="templates")
-
 # Auth Gateway configuration
 AUTH_GATEWAY_URL = "http://localhost:8000"  # Replace with your Auth Gateway URL
 CALLBACK_URI = "http://localhost:8001/auth/callback"  # Your application's callback URL
@@ -25,6 +21,21 @@ CALLBACK_URI = "http://localhost:8001/auth/callback"  # Your application's callb
 # Initialize Auth Gateway SDK with FastAPI integration
 auth = AuthGatewayFastAPI(AUTH_GATEWAY_URL)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the gateway connection at startup so the first login doesn't wait for it."""
+    await auth.warm_up()
+    yield
+    await auth.close()
+
+
+# Initialize FastAPI app
+app = FastAPI(title="FastAPI Auth Gateway Client (SDK Example)", lifespan=lifespan)
+
+# Initialize templates
+templates = Jinja2Templates(directory="templates")
+
 # Add authentication routes (login, logout, me, status)
 app.include_router(auth.create_auth_routes())
 
@@ -148,23 +159,6 @@ async def health_check():
             }
         }
 
-# Middleware to extract token from cookies for Bearer token dependencies
-@app.middleware("http")
-async def token_middleware(request: Request, call_next):
-    """Extract token from cookies and add to request headers."""
-    token = request.cookies.get("access_token")
-    if token and "authorization" not in request.headers:
-        # Create mutable headers
-        headers = dict(request.headers)
-        headers["authorization"] = f"Bearer {token}"
-        
-        # Update request scope
-        request.scope["headers"] = [
-            (k.encode(), v.encode()) for k, v in headers.items()
-        ]
-    
-    return await call_next(request)
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8001, reload=True)
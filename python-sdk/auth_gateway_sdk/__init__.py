@@ -7,35 +7,88 @@ Firebase authentication with Google Sign-In.
 
 __version__ = "1.0.0"
 
-# Core client classes
-from .client import AuthGatewayClient, SyncAuthGatewayClient
+import importlib
+from typing import TYPE_CHECKING, Any
 
-# Configuration
-from .config import AuthGatewayConfig
+# Public names and the submodule defining each; submodules (and httpx/pydantic with
+# them) are imported on first attribute access rather than when the package is imported
+_LAZY_IMPORTS = {
+    # Core client classes
+    "AuthGatewayClient": "client",
+    "SyncAuthGatewayClient": "client",
+    "close_shared_clients": "client",
+    
+    # Configuration
+    "AuthGatewayConfig": "config",
+    
+    # Models
+    "UserData": "models",
+    "LoginRequest": "models",
+    "LoginResponse": "models",
+    "AuthCallbackRequest": "models",
+    "AuthCallbackResponse": "models",
+    "HealthResponse": "models",
+    "ErrorResponse": "models",
+    "LogoutResponse": "models",
+    "AuthStatusResponse": "models",
+    "VerifyTokensRequest": "models",
+    "TokenVerificationResult": "models",
+    "VerifyTokensResponse": "models",
+    
+    # Exceptions
+    "AuthGatewayException": "exceptions",
+    "AuthenticationError": "exceptions",
+    "TokenExpiredError": "exceptions",
+    "TokenInvalidError": "exceptions",
+    "DomainNotAllowedError": "exceptions",
+    "NetworkError": "exceptions",
+    "ConfigurationError": "exceptions",
+    "RateLimitError": "exceptions",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public name from its submodule on first access (PEP 562)."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    """List lazily imported names alongside the module's own attributes."""
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
 
-# Models
-from .models import (
-    UserData,
-    LoginRequest,
-    LoginResponse,
-    AuthCallbackRequest,
-    AuthCallbackResponse,
-    HealthResponse,
-    ErrorResponse,
-    LogoutResponse,
-)
 
-# Exceptions
-from .exceptions import (
-    AuthGatewayException,
-    AuthenticationError,
-    TokenExpiredError,
-    TokenInvalidError,
-    DomainNotAllowedError,
-    NetworkError,
-    ConfigurationError,
-    RateLimitError,
-)
+if TYPE_CHECKING:
+    from .client import AuthGatewayClient, SyncAuthGatewayClient, close_shared_clients
+    from .config import AuthGatewayConfig
+    from .models import (
+        UserData,
+        LoginRequest,
+        LoginResponse,
+        AuthCallbackRequest,
+        AuthCallbackResponse,
+        HealthResponse,
+        ErrorResponse,
+        LogoutResponse,
+        AuthStatusResponse,
+        VerifyTokensRequest,
+        TokenVerificationResult,
+        VerifyTokensResponse,
+    )
+    from .exceptions import (
+        AuthGatewayException,
+        AuthenticationError,
+        TokenExpiredError,
+        TokenInvalidError,
+        DomainNotAllowedError,
+        NetworkError,
+        ConfigurationError,
+        RateLimitError,
+    )
 
 # Main public API
 __all__ = [
@@ -45,6 +98,7 @@ __all__ = [
     # Core clients
     "AuthGatewayClient",
     "SyncAuthGatewayClient",
+    "close_shared_clients",
     
     # Configuration
     "AuthGatewayConfig",
@@ -58,6 +112,10 @@ __all__ = [
     "HealthResponse",
     "ErrorResponse",
     "LogoutResponse",
+    "AuthStatusResponse",
+    "VerifyTokensRequest",
+    "TokenVerificationResult",
+    "VerifyTokensResponse",
     
     # Exceptions
     "AuthGatewayException",
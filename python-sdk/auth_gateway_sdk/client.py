@@ -2,13 +2,21 @@
 Core HTTP client for Auth Gateway SDK.
 """
 import asyncio
+import atexit
+import base64
+import json
 import logging
-from typing import Optional, Union
+import random
+import threading
+import time
+import weakref
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 import httpx
+from cachetools import TTLCache
 from pydantic import ValidationError
 
 from .config import AuthGatewayConfig, get_default_config
-from .models import LoginRequest, LoginResponse, UserData, HealthResponse, LogoutResponse
+from .models import LoginResponse, UserData, HealthResponse, LogoutResponse, VerifyTokensResponse
 from .exceptions import (
     AuthGatewayException,
     AuthenticationError,
@@ -23,6 +31,151 @@ from .exceptions import (
 logger = logging.getLogger(__name__)
 
 
+# Most tokens the gateway accepts in one /verify-tokens request
+_MAX_BATCH_TOKENS = 100
+
+# Seconds to wait before retrying a rate-limited request, indexed by attempt
+_RETRY_BACKOFF = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0)
+
+# Connection pools shared by all clients with the same transport settings, per event loop
+# (httpx connections can't be used across loops)
+# Maps event loop -> {(timeout, verify_ssl): _SharedHttpClient}; every sync client's
+# loop thread uses it too, so all access goes through _CLIENT_REGISTRY_LOCK
+_CLIENT_REGISTRY: Dict[asyncio.AbstractEventLoop, Dict[Tuple[int, bool], "_SharedHttpClient"]] = {}
+_CLIENT_REGISTRY_LOCK = threading.Lock()
+
+
+class _SharedHttpClient:
+    """A pooled HTTP client and the number of AuthGatewayClients currently using it."""
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop, key: Tuple[int, bool], client: httpx.AsyncClient):
+        self.loop = loop
+        self.key = key
+        self.client = client
+        self.users = 0
+
+
+def _acquire_shared_http_client(timeout: int, verify_ssl: bool) -> _SharedHttpClient:
+    """Get the pooled HTTP/2 client for the running event loop and transport settings, and count the new user."""
+    loop = asyncio.get_running_loop()
+    with _CLIENT_REGISTRY_LOCK:
+        # Pools of loops that have since closed (e.g. after asyncio.run) can never be used or
+        # closed again; drop them so their connections can be garbage collected
+        for closed_loop in [other for other in _CLIENT_REGISTRY if other.is_closed()]:
+            _CLIENT_REGISTRY.pop(closed_loop, None)
+        
+        clients = _CLIENT_REGISTRY.setdefault(loop, {})
+        shared = clients.get((timeout, verify_ssl))
+        if shared is None or shared.client.is_closed:
+            shared = clients[(timeout, verify_ssl)] = _SharedHttpClient(
+                loop,
+                (timeout, verify_ssl),
+                httpx.AsyncClient(
+                    http2=True,
+                    timeout=timeout,
+                    verify=verify_ssl,
+                    follow_redirects=True,
+                    limits=httpx.Limits(
+                        max_connections=200,
+                        max_keepalive_connections=100,
+                        keepalive_expiry=30.0
+                    ),
+                ),
+            )
+        shared.users += 1
+        return shared
+
+
+async def _release_shared_http_client(shared: _SharedHttpClient) -> None:
+    """Drop one user of a pooled HTTP client, closing the client once nobody uses it."""
+    running_loop = asyncio.get_running_loop()
+    with _CLIENT_REGISTRY_LOCK:
+        shared.users -= 1
+        if shared.users > 0:
+            return
+        # A pool whose loop is idle can only be closed by that loop; keep it registered so a
+        # later user, close_shared_clients() or the exit hook can still reach it
+        if shared.loop is not running_loop and not shared.loop.is_closed() and not shared.loop.is_running():
+            return
+        clients = _CLIENT_REGISTRY.get(shared.loop, {})
+        if clients.get(shared.key) is shared:
+            clients.pop(shared.key, None)
+            if not clients:
+                _CLIENT_REGISTRY.pop(shared.loop, None)
+    
+    if shared.client.is_closed or shared.loop.is_closed():
+        return
+    if shared.loop is running_loop:
+        await shared.client.aclose()
+    else:
+        # Released from another loop: close the pool on the loop that owns its connections
+        asyncio.run_coroutine_threadsafe(shared.client.aclose(), shared.loop)
+
+
+async def close_shared_clients() -> None:
+    """Close the pooled HTTP clients of the running event loop, e.g. on application shutdown."""
+    with _CLIENT_REGISTRY_LOCK:
+        clients = _CLIENT_REGISTRY.pop(asyncio.get_running_loop(), {})
+    for shared in clients.values():
+        await shared.client.aclose()
+
+
+@atexit.register
+def _close_idle_loop_clients() -> None:
+    """Close pooled HTTP clients left open at interpreter exit whose event loop can still run them."""
+    with _CLIENT_REGISTRY_LOCK:
+        registry = list(_CLIENT_REGISTRY.items())
+        _CLIENT_REGISTRY.clear()
+    for loop, clients in registry:
+        if not loop.is_closed() and not loop.is_running():
+            for shared in clients.values():
+                try:
+                    loop.run_until_complete(shared.client.aclose())
+                except Exception as e:
+                    logger.debug(f"Could not close pooled HTTP client at exit: {e}")
+
+
+def _error_for_status(status_code: int, message: str, details: dict) -> AuthGatewayException:
+    """Build the exception matching an error status code and message."""
+    keywords, error_class = _ERROR_CLASSES.get(status_code, _DEFAULT_ERROR_CLASS)
+    if keywords:
+        lowered = message.lower()
+        error_class = next(
+            (keyword_class for keyword, keyword_class in keywords if keyword in lowered),
+            error_class
+        )
+    return error_class(message, status_code=status_code, details=details)
+
+
+class _CachedUser(NamedTuple):
+    """Verified user data as stored in the token cache: a plain tuple, far smaller than UserData."""
+    
+    uid: str
+    email: str
+    display_name: Optional[str]
+    photo_url: Optional[str]
+    expires_at: float
+
+
+# Exception raised per error status: (message keyword, class) checks in order, then a default
+_ERROR_CLASSES = {
+    401: ((("expired", TokenExpiredError), ("invalid", TokenInvalidError)), AuthenticationError),
+    403: ((("domain", DomainNotAllowedError),), AuthenticationError),
+    429: ((), RateLimitError),
+}
+_DEFAULT_ERROR_CLASS = ((), AuthGatewayException)
+
+
+def _token_expiry(token: str) -> Optional[float]:
+    """Read the ``exp`` claim from a JWT without verifying it; None if it can't be read."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
 class AuthGatewayClient:
     """
     Async HTTP client for Auth Gateway API.
@@ -59,17 +212,33 @@ class AuthGatewayClient:
             raise ConfigurationError(f"Invalid config type: {type(config)}")
         
         self._client: Optional[httpx.AsyncClient] = None
+        # The pooled client this instance holds a share of, released by close()
+        self._shared_client: Optional[_SharedHttpClient] = None
+        
+        # Verified tokens map to _CachedUser entries; disabled when TTL or size is 0
+        self._token_cache: Optional[TTLCache] = None
+        if self.config.token_cache_ttl and self.config.token_cache_size:
+            self._token_cache = TTLCache(
+                maxsize=self.config.token_cache_size, ttl=self.config.token_cache_ttl
+            )
+        self._pending_verifications: Dict[str, "asyncio.Future[UserData]"] = {}
     
     async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create async HTTP client."""
-        if self._client is None:
-            self._client = httpx.AsyncClient(
-                timeout=self.config.timeout,
-                verify=self.config.verify_ssl,
-                follow_redirects=True,
+        """Get the async HTTP client, shared with other clients using the same settings."""
+        if self._client is None or self._client.is_closed:
+            await self._release_shared_client()
+            self._shared_client = _acquire_shared_http_client(
+                self.config.timeout, self.config.verify_ssl
             )
+            self._client = self._shared_client.client
         return self._client
     
+    async def _release_shared_client(self) -> None:
+        """Release this instance's share of the pooled HTTP client, if it holds one."""
+        shared, self._shared_client = self._shared_client, None
+        if shared is not None:
+            await _release_shared_http_client(shared)
+    
     async def _make_request(
         self, 
         method: str, 
@@ -94,17 +263,25 @@ class AuthGatewayClient:
         """
         client = await self._get_client()
         url = f"{self.config.base_url}{endpoint}"
+        loop = asyncio.get_running_loop()
+        # Rate-limit backoffs are only started within the configured timeout of the first
+        # attempt; timeouts and network errors are retried retry_attempts times regardless,
+        # since a single timed-out attempt already takes the whole timeout
+        deadline = loop.time() + self.config.timeout
         
         for attempt in range(self.config.retry_attempts + 1):
+            retries_left = attempt < self.config.retry_attempts
             try:
                 logger.debug(f"Making {method} request to {url} (attempt {attempt + 1})")
                 response = await client.request(method, url, **kwargs)
                 
                 # Handle rate limiting
                 if response.status_code == 429:
-                    if attempt < self.config.retry_attempts:
-                        wait_time = 2 ** attempt  # Exponential backoff
-                        logger.warning(f"Rate limited, waiting {wait_time}s before retry")
+                    # Exponential backoff with jitter so rate-limited clients don't retry in lockstep
+                    backoff = _RETRY_BACKOFF[min(attempt, len(_RETRY_BACKOFF) - 1)]
+                    wait_time = backoff + random.uniform(0, 0.1)
+                    if retries_left and loop.time() + wait_time < deadline:
+                        logger.warning(f"Rate limited, waiting {wait_time:.2f}s before retry")
                         await asyncio.sleep(wait_time)
                         continue
                     else:
@@ -113,13 +290,13 @@ class AuthGatewayClient:
                 return response
                 
             except httpx.TimeoutException as e:
-                if attempt < self.config.retry_attempts:
+                if retries_left:
                     logger.warning(f"Request timeout, retrying... (attempt {attempt + 1})")
                     continue
                 raise NetworkError(f"Request timeout: {str(e)}")
             
             except httpx.NetworkError as e:
-                if attempt < self.config.retry_attempts:
+                if retries_left:
                     logger.warning(f"Network error, retrying... (attempt {attempt + 1})")
                     continue
                 raise NetworkError(f"Network error: {str(e)}")
@@ -148,22 +325,7 @@ class AuthGatewayClient:
             message = f"HTTP {response.status_code}: {response.text[:200]}"
             details = {}
         
-        if response.status_code == 401:
-            if "expired" in message.lower():
-                raise TokenExpiredError(message, status_code=401, details=details)
-            elif "invalid" in message.lower():
-                raise TokenInvalidError(message, status_code=401, details=details)
-            else:
-                raise AuthenticationError(message, status_code=401, details=details)
-        elif response.status_code == 403:
-            if "domain" in message.lower():
-                raise DomainNotAllowedError(message, status_code=403, details=details)
-            else:
-                raise AuthenticationError(message, status_code=403, details=details)
-        elif response.status_code == 429:
-            raise RateLimitError(message, status_code=429, details=details)
-        else:
-            raise AuthGatewayException(message, status_code=response.status_code, details=details)
+        raise _error_for_status(response.status_code, message, details)
     
     async def generate_login_url(self, redirect_uri: Optional[str] = None) -> LoginResponse:
         """
@@ -178,18 +340,15 @@ class AuthGatewayClient:
         Raises:
             AuthGatewayException: If the request fails
         """
-        request_data = LoginRequest(redirect_uri=redirect_uri)
+        # Same body as LoginRequest(redirect_uri=...).model_dump(exclude_none=True)
+        request_data = {"redirect_uri": redirect_uri} if redirect_uri is not None else {}
         
-        response = await self._make_request(
-            "POST",
-            "/auth/login",
-            json=request_data.model_dump(exclude_none=True)
-        )
+        response = await self._make_request("POST", "/auth/login", json=request_data)
         
         self._handle_error_response(response)
         
         try:
-            return LoginResponse.model_validate(response.json())
+            return LoginResponse.model_validate_json(response.content)
         except ValidationError as e:
             raise AuthGatewayException(f"Invalid response format: {e}")
     
@@ -210,6 +369,20 @@ class AuthGatewayClient:
         if not token:
             raise TokenInvalidError("Token cannot be empty")
         
+        cached = self._get_cached_user(token)
+        if cached is not None:
+            return cached
+        
+        # Concurrent verifications of the same token share one gateway request
+        pending = self._pending_verifications.get(token)
+        if pending is None:
+            pending = asyncio.ensure_future(self._verify_token_uncached(token))
+            self._pending_verifications[token] = pending
+            pending.add_done_callback(lambda _: self._pending_verifications.pop(token, None))
+        return await asyncio.shield(pending)
+    
+    async def _verify_token_uncached(self, token: str) -> UserData:
+        """Verify a token with the gateway and cache the result."""
         headers = {"Authorization": f"Bearer {token}"}
         
         response = await self._make_request("POST", "/verify-token", headers=headers)
@@ -217,9 +390,110 @@ class AuthGatewayClient:
         self._handle_error_response(response)
         
         try:
-            return UserData.model_validate(response.json())
+            user_data = UserData.model_validate_json(response.content)
         except ValidationError as e:
             raise AuthGatewayException(f"Invalid response format: {e}")
+        
+        self._cache_user(token, user_data)
+        return user_data
+    
+    async def verify_tokens(self, tokens: List[str]) -> List[Union[UserData, AuthGatewayException]]:
+        """
+        Verify several Firebase ID tokens with as few gateway requests as possible.
+        
+        Cached tokens are answered locally; the rest are sent in batches of up to
+        100 tokens per request.
+        
+        Args:
+            tokens: Firebase ID tokens to verify
+            
+        Returns:
+            One entry per token, in order: UserData for a valid token, otherwise the
+            exception verify_token would have raised for it (returned, not raised)
+            
+        Raises:
+            AuthGatewayException: If a batch request itself fails
+        """
+        results: Dict[str, Union[UserData, AuthGatewayException]] = {}
+        uncached = []
+        for token in dict.fromkeys(tokens):
+            if not token:
+                results[token] = TokenInvalidError("Token cannot be empty")
+                continue
+            cached = self._get_cached_user(token)
+            if cached is not None:
+                results[token] = cached
+            else:
+                uncached.append(token)
+        
+        batches = [
+            uncached[start:start + _MAX_BATCH_TOKENS]
+            for start in range(0, len(uncached), _MAX_BATCH_TOKENS)
+        ]
+        for batch_results in await asyncio.gather(*map(self._verify_token_batch, batches)):
+            results.update(batch_results)
+        return [results[token] for token in tokens]
+    
+    async def _verify_token_batch(
+        self, tokens: List[str]
+    ) -> Dict[str, Union[UserData, AuthGatewayException]]:
+        """Verify one batch of tokens with the gateway and cache the valid ones."""
+        response = await self._make_request("POST", "/verify-tokens", json={"tokens": tokens})
+        
+        self._handle_error_response(response)
+        
+        try:
+            batch = VerifyTokensResponse.model_validate_json(response.content)
+        except ValidationError as e:
+            raise AuthGatewayException(f"Invalid response format: {e}")
+        if len(batch.results) != len(tokens):
+            raise AuthGatewayException(
+                f"Invalid response format: expected {len(tokens)} results, got {len(batch.results)}"
+            )
+        
+        results: Dict[str, Union[UserData, AuthGatewayException]] = {}
+        for token, result in zip(tokens, batch.results):
+            if result.user is not None:
+                self._cache_user(token, result.user)
+                results[token] = result.user
+            else:
+                results[token] = _error_for_status(
+                    result.status_code or 401, result.message or "Token verification failed", {}
+                )
+        return results
+    
+    def _get_cached_user(self, token: str) -> Optional[UserData]:
+        """Get the cached user data for a token, or None if not cached or expired."""
+        if self._token_cache is None:
+            return None
+        cached: Optional[_CachedUser] = self._token_cache.get(token)
+        if cached is None or time.time() >= cached.expires_at:
+            return None
+        # A fresh model per call, so callers can't alter each other's (or the cache's) data.
+        # The fields were validated when cached, so skip validating them again.
+        return UserData.model_construct(
+            uid=cached.uid,
+            email=cached.email,
+            display_name=cached.display_name,
+            photo_url=cached.photo_url,
+        )
+    
+    def _cache_user(self, token: str, user_data: UserData) -> None:
+        """Cache verified user data for a token."""
+        if self._token_cache is None:
+            return
+        # Never reuse a result past the token's own expiry
+        expires_at = time.time() + self.config.token_cache_ttl
+        token_exp = _token_expiry(token)
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        self._token_cache[token] = _CachedUser(
+            user_data.uid,
+            user_data.email,
+            user_data.display_name,
+            user_data.photo_url,
+            expires_at,
+        )
     
     async def health_check(self) -> HealthResponse:
         """
@@ -236,7 +510,7 @@ class AuthGatewayClient:
         self._handle_error_response(response)
         
         try:
-            return HealthResponse.model_validate(response.json())
+            return HealthResponse.model_validate_json(response.content)
         except ValidationError as e:
             raise AuthGatewayException(f"Invalid response format: {e}")
     
@@ -256,15 +530,22 @@ class AuthGatewayClient:
         self._handle_error_response(response)
         
         try:
-            return LogoutResponse.model_validate(response.json())
+            return LogoutResponse.model_validate_json(response.content)
         except ValidationError as e:
             raise AuthGatewayException(f"Invalid response format: {e}")
     
     async def close(self) -> None:
-        """Close the HTTP client."""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        """
+        Release the HTTP client.
+        
+        The connection pool is shared with other clients on the same event loop and
+        is closed once the last of them is closed.
+        """
+        client, self._client = self._client, None
+        if self._shared_client is not None:
+            await self._release_shared_client()
+        elif client is not None:
+            await client.aclose()
     
     async def __aenter__(self):
         """Async context manager entry."""
@@ -275,6 +556,24 @@ class AuthGatewayClient:
         await self.close()
 
 
+def _run_background_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Run a sync client's event loop until stopped, then close its connection pools and the loop."""
+    try:
+        loop.run_forever()
+    finally:
+        # The loop's connection pools can't be used by any other loop
+        loop.run_until_complete(close_shared_clients())
+        loop.close()
+
+
+def _stop_background_loop(loop: asyncio.AbstractEventLoop, thread: threading.Thread) -> None:
+    """Stop a sync client's event loop and wait for its thread to finish closing it."""
+    loop.call_soon_threadsafe(loop.stop)
+    # The finalizer can also run from garbage collection on the loop's own thread
+    if threading.current_thread() is not thread:
+        thread.join()
+
+
 class SyncAuthGatewayClient:
     """
     Synchronous wrapper around AuthGatewayClient for non-async applications.
@@ -283,16 +582,27 @@ class SyncAuthGatewayClient:
     def __init__(self, config: Union[str, AuthGatewayConfig, None] = None):
         """Initialize synchronous client."""
         self._async_client = AuthGatewayClient(config)
+        self._loop_lock = threading.Lock()
+        self._start_loop()
+    
+    def _start_loop(self) -> None:
+        """Start the event loop that runs this client's requests on a background thread."""
+        # One event loop per client, running on a background thread until close() (which a
+        # later call undoes by starting a new one) or until the client is garbage collected
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=_run_background_loop, args=(self._loop,), name="auth-gateway-sync-client", daemon=True
+        )
+        self._thread.start()
+        self._finalizer = weakref.finalize(self, _stop_background_loop, self._loop, self._thread)
     
     def _run_async(self, coro):
-        """Run async coroutine in sync context."""
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        return loop.run_until_complete(coro)
+        """Run async coroutine on the client's event loop and wait for its result."""
+        with self._loop_lock:
+            if not self._finalizer.alive:
+                self._start_loop()
+            future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result()
     
     def generate_login_url(self, redirect_uri: Optional[str] = None) -> LoginResponse:
         """Synchronous version of generate_login_url."""
@@ -311,8 +621,12 @@ class SyncAuthGatewayClient:
         return self._run_async(self._async_client.logout())
     
     def close(self) -> None:
-        """Close the client."""
-        self._run_async(self._async_client.close())
+        """Close the client and stop its event loop; later calls start a new one."""
+        with self._loop_lock:
+            if not self._finalizer.alive:
+                return
+            asyncio.run_coroutine_threadsafe(self._async_client.close(), self._loop).result()
+            self._finalizer()
     
     def __enter__(self):
         """Context manager entry."""
@@ -2,7 +2,8 @@
 Configuration management for Auth Gateway SDK.
 """
 import os
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Optional, Tuple, Type
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -13,6 +14,10 @@ class AuthGatewayConfig(BaseModel):
     timeout: int = Field(30, description="Request timeout in seconds")
     retry_attempts: int = Field(3, description="Number of retry attempts for failed requests")
     verify_ssl: bool = Field(True, description="Whether to verify SSL certificates")
+    token_cache_ttl: int = Field(
+        30, description="Seconds a verified token is reused without calling the gateway (0 disables)"
+    )
+    token_cache_size: int = Field(10_000, description="Maximum number of verified tokens to cache")
     
     @field_validator('base_url')
     @classmethod
@@ -40,9 +45,22 @@ class AuthGatewayConfig(BaseModel):
             raise ValueError("retry_attempts cannot be negative")
         return v
     
+    @field_validator('token_cache_ttl', 'token_cache_size')
+    @classmethod
+    def validate_token_cache(cls, v: int) -> int:
+        """Validate token cache settings."""
+        if v < 0:
+            raise ValueError("token cache settings cannot be negative")
+        return v
+    
     @classmethod
     def from_env(cls, prefix: str = "AUTH_GATEWAY_") -> "AuthGatewayConfig":
-        """Create configuration from environment variables."""
+        """
+        Create configuration from environment variables.
+        
+        Configurations are validated once per distinct set of environment values; each
+        call returns its own copy of the cached configuration.
+        """
         base_url = os.getenv(f"{prefix}URL")
         if not base_url:
             raise ValueError(
@@ -50,17 +68,61 @@ class AuthGatewayConfig(BaseModel):
                 "Set it to your Auth Gateway URL (e.g., https://auth.example.com)"
             )
         
-        return cls(
-            base_url=base_url,
-            timeout=int(os.getenv(f"{prefix}TIMEOUT", "30")),
-            retry_attempts=int(os.getenv(f"{prefix}RETRY_ATTEMPTS", "3")),
-            verify_ssl=os.getenv(f"{prefix}VERIFY_SSL", "true").lower() == "true",
-        )
+        # Cached instances are shared; callers get a private (shallow) copy to modify freely
+        return _config_from_env_values(
+            cls,
+            base_url,
+            os.getenv(f"{prefix}TIMEOUT", "30"),
+            os.getenv(f"{prefix}RETRY_ATTEMPTS", "3"),
+            os.getenv(f"{prefix}VERIFY_SSL", "true"),
+            os.getenv(f"{prefix}TOKEN_CACHE_TTL", "30"),
+            os.getenv(f"{prefix}TOKEN_CACHE_SIZE", "10000"),
+        ).model_copy()
     
     @classmethod
     def from_url(cls, base_url: str, **kwargs) -> "AuthGatewayConfig":
-        """Create configuration with just a base URL and optional overrides."""
-        return cls(base_url=base_url, **kwargs)
+        """
+        Create configuration with just a base URL and optional overrides.
+        
+        Configurations are validated once per distinct set of arguments (e.g. one per
+        client or integration instance); each call returns its own copy.
+        """
+        overrides = tuple(sorted(kwargs.items()))
+        try:
+            hash(overrides)
+        except TypeError:
+            # Not cacheable; let validation report unexpected override values
+            return cls(base_url=base_url, **kwargs)
+        return _config_from_url(cls, base_url, overrides).model_copy()
+
+
+@lru_cache(maxsize=32)
+def _config_from_url(
+    cls: Type[AuthGatewayConfig], base_url: str, overrides: Tuple[Tuple[str, Any], ...]
+) -> AuthGatewayConfig:
+    """Validate configuration built from a base URL once per distinct set of arguments."""
+    return cls(base_url=base_url, **dict(overrides))
+
+
+@lru_cache(maxsize=8)
+def _config_from_env_values(
+    cls: Type[AuthGatewayConfig],
+    base_url: str,
+    timeout: str,
+    retry_attempts: str,
+    verify_ssl: str,
+    token_cache_ttl: str,
+    token_cache_size: str,
+) -> AuthGatewayConfig:
+    """Validate configuration read from the environment once per distinct set of values."""
+    return cls(
+        base_url=base_url,
+        timeout=int(timeout),
+        retry_attempts=int(retry_attempts),
+        verify_ssl=verify_ssl.lower() == "true",
+        token_cache_ttl=int(token_cache_ttl),
+        token_cache_size=int(token_cache_size),
+    )
 
 
 def get_default_config() -> Optional[AuthGatewayConfig]:
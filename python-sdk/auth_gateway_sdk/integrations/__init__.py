@@ -1,7 +1,31 @@
 """
 Integration modules for various frameworks.
 """
-from .fastapi import AuthGatewayFastAPI, create_auth_dependency, get_auth_client, setup_auth_middleware
+import importlib
+from typing import TYPE_CHECKING, Any
+
+# Framework integrations are imported on first use, so importing this package doesn't
+# pull in every supported framework
+_LAZY_IMPORTS = {
+    "AuthGatewayFastAPI": "fastapi",
+    "create_auth_dependency": "fastapi",
+    "get_auth_client": "fastapi",
+    "setup_auth_middleware": "fastapi",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public name from its integration module on first access (PEP 562)."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+if TYPE_CHECKING:
+    from .fastapi import AuthGatewayFastAPI, create_auth_dependency, get_auth_client, setup_auth_middleware
 
 __all__ = [
     "AuthGatewayFastAPI", 
@@ -6,15 +6,16 @@ with the Auth Gateway service, including dependency injection, middleware,
 and route helpers.
 """
 import logging
-from typing import Optional, Callable, List
+from typing import Optional, Callable, List, Tuple
 from fastapi import Depends, HTTPException, Request, APIRouter
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import RedirectResponse
 import asyncio
+import httpx
 
 from ..client import AuthGatewayClient
 from ..config import AuthGatewayConfig
-from ..models import UserData, LoginResponse
+from ..models import AuthStatusResponse, UserData, LoginResponse
 from ..exceptions import (
     AuthGatewayException,
     AuthenticationError,
@@ -29,6 +30,29 @@ logger = logging.getLogger(__name__)
 # Global security scheme for Bearer token extraction
 security = HTTPBearer(auto_error=False)
 
+# Raw Cookie header prefix of the token cookie read by CookieToBearerMiddleware
+_ACCESS_TOKEN_COOKIE = b"access_token="
+
+# Token verification errors as (status code, detail, send Bearer challenge); a None detail
+# means the exception's own message. Subclasses not listed use their nearest listed base.
+_HTTP_ERRORS = {
+    TokenExpiredError: (401, "Token expired", True),
+    TokenInvalidError: (401, "Invalid token", True),
+    DomainNotAllowedError: (403, "Email domain not allowed", False),
+    AuthenticationError: (401, None, True),
+    NetworkError: (503, "Authentication service unavailable", False),
+    AuthGatewayException: (500, "Authentication service error", False),
+}
+
+
+def _http_error_for(error: AuthGatewayException) -> Tuple[int, str, bool]:
+    """Get the HTTP status code, detail and Bearer challenge flag for a verification error."""
+    http_error = _HTTP_ERRORS.get(type(error))
+    if http_error is None:
+        http_error = next(_HTTP_ERRORS[cls] for cls in type(error).__mro__ if cls in _HTTP_ERRORS)
+    status_code, detail, bearer_challenge = http_error
+    return status_code, error.message if detail is None else detail, bearer_challenge
+
 
 class AuthGatewayFastAPI:
     """
@@ -58,25 +82,25 @@ class AuthGatewayFastAPI:
         self.client = AuthGatewayClient(config)
         self.auto_error = auto_error
         
-        # Create bound dependency functions
+        # Create bound dependency functions. Both share one verification dependency, which
+        # FastAPI resolves once per request even when a route uses both of them.
+        self._verify_request_token = self._create_token_verification_dependency()
         self._current_user_optional = self._create_current_user_dependency(required=False)
         self._current_user_required = self._create_current_user_dependency(required=True)
     
-    def _create_current_user_dependency(self, required: bool = True) -> Callable:
-        """Create a dependency function for getting current user."""
+    def _create_token_verification_dependency(self) -> Callable:
+        """Create the dependency function that verifies the request's token."""
         
-        async def get_current_user(
+        async def verify_request_token(
             credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
             request: Request = None
-        ) -> Optional[UserData]:
+        ) -> Tuple[Optional[UserData], Optional[AuthGatewayException]]:
             """
-            Dependency to get current authenticated user.
+            Dependency to verify the token sent with the request.
             
             Returns:
-                UserData if authenticated, None if not (when required=False)
-                
-            Raises:
-                HTTPException: If authentication fails and required=True
+                The verified user (or None) and the verification error (or None);
+                both are None when the request carries no token
             """
             token = None
             
@@ -88,78 +112,55 @@ class AuthGatewayFastAPI:
             if not token and request:
                 token = request.cookies.get("access_token")
             
-            # If no token and not required, return None
             if not token:
-                if required and self.auto_error:
-                    raise HTTPException(
-                        status_code=401,
-                        detail="Authentication required",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-                return None
+                return None, None
             
             # Verify token
             try:
                 user = await self.client.verify_token(token)
                 logger.debug(f"User authenticated: {user.email}")
-                return user
-                
-            except TokenExpiredError as e:
-                logger.warning(f"Token expired: {e.message}")
-                if required and self.auto_error:
-                    raise HTTPException(
-                        status_code=401,
-                        detail="Token expired",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-                return None
-                
-            except TokenInvalidError as e:
-                logger.warning(f"Invalid token: {e.message}")
-                if required and self.auto_error:
-                    raise HTTPException(
-                        status_code=401,
-                        detail="Invalid token",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-                return None
-                
-            except DomainNotAllowedError as e:
-                logger.warning(f"Domain not allowed: {e.message}")
-                if required and self.auto_error:
-                    raise HTTPException(
-                        status_code=403,
-                        detail="Email domain not allowed"
-                    )
-                return None
+                return user, None
+            except AuthGatewayException as e:
+                if isinstance(e, AuthenticationError):
+                    logger.warning(f"Token verification failed: {e.message}")
+                else:
+                    logger.error(f"Auth Gateway error during token verification: {e.message}")
+                return None, e
+        
+        return verify_request_token
+    
+    def _create_current_user_dependency(self, required: bool = True) -> Callable:
+        """Create a dependency function for getting current user."""
+        
+        async def get_current_user(
+            verification: Tuple[Optional[UserData], Optional[AuthGatewayException]] = Depends(
+                self._verify_request_token
+            )
+        ) -> Optional[UserData]:
+            """
+            Dependency to get current authenticated user.
+            
+            Returns:
+                UserData if authenticated, None if not (when required=False)
                 
-            except AuthenticationError as e:
-                logger.warning(f"Authentication error: {e.message}")
-                if required and self.auto_error:
+            Raises:
+                HTTPException: If authentication fails and required=True
+            """
+            user, error = verification
+            if user is None and required and self.auto_error:
+                if error is None:
                     raise HTTPException(
                         status_code=401,
-                        detail=e.message,
+                        detail="Authentication required",
                         headers={"WWW-Authenticate": "Bearer"},
                     )
-                return None
-                
-            except NetworkError as e:
-                logger.error(f"Network error during token verification: {e.message}")
-                if required and self.auto_error:
-                    raise HTTPException(
-                        status_code=503,
-                        detail="Authentication service unavailable"
-                    )
-                return None
-                
-            except AuthGatewayException as e:
-                logger.error(f"Auth Gateway error: {e.message}")
-                if required and self.auto_error:
-                    raise HTTPException(
-                        status_code=500,
-                        detail="Authentication service error"
-                    )
-                return None
+                status_code, detail, bearer_challenge = _http_error_for(error)
+                raise HTTPException(
+                    status_code=status_code,
+                    detail=detail,
+                    headers={"WWW-Authenticate": "Bearer"} if bearer_challenge else None,
+                )
+            return user
         
         return get_current_user
     
@@ -214,31 +215,25 @@ class AuthGatewayFastAPI:
         # Login route - GET with redirect (matches client's working pattern)
         async def login_handler(redirect_uri: Optional[str] = None):
             """Initiate login by redirecting to Google OAuth."""
+            uri = redirect_uri or login_redirect_uri
+            if uri is None:
+                raise HTTPException(
+                    status_code=400, 
+                    detail="redirect_uri is required. Either provide it as a query parameter or configure login_redirect_uri when creating routes."
+                )
             try:
-                uri = redirect_uri or login_redirect_uri
-                if uri is None:
-                    raise HTTPException(
-                        status_code=400, 
-                        detail="redirect_uri is required. Either provide it as a query parameter or configure login_redirect_uri when creating routes."
-                    )
                 response = await client.generate_login_url(uri)
-                return RedirectResponse(url=response.url)
-            except HTTPException:
-                raise
             except Exception as e:
                 logger.error(f"Login URL generation failed: {str(e)}")
                 raise HTTPException(status_code=500, detail=f"Failed to initiate login: {str(e)}")
+            return RedirectResponse(url=response.url)
         
         # Logout route
         async def logout_handler():
             """Logout by clearing cookies."""
-            try:
-                response = RedirectResponse(url="/")
-                response.delete_cookie("access_token")
-                return response
-            except Exception as e:
-                logger.error(f"Logout failed: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Logout failed: {str(e)}")
+            response = RedirectResponse(url="/")
+            response.delete_cookie("access_token")
+            return response
         
         # Me route
         async def me_handler(user: UserData = Depends(auth_required)):
@@ -248,21 +243,41 @@ class AuthGatewayFastAPI:
         # Status route
         async def status_handler(user: Optional[UserData] = Depends(auth_optional)):
             """Check authentication status."""
-            return {
-                "authenticated": user is not None,
-                "user": user
-            }
+            return AuthStatusResponse(authenticated=user is not None, user=user)
         
         # Add routes to router
         router.add_api_route("/login", login_handler, methods=["GET"], summary="Initiate login")
         router.add_api_route("/logout", logout_handler, methods=["GET"], summary="Logout")
-        router.add_api_route("/me", me_handler, methods=["GET"], summary="Get current user")
-        router.add_api_route("/status", status_handler, methods=["GET"], summary="Check auth status")
+        router.add_api_route(
+            "/me", me_handler, methods=["GET"], response_model=UserData, summary="Get current user"
+        )
+        router.add_api_route(
+            "/status",
+            status_handler,
+            methods=["GET"],
+            response_model=AuthStatusResponse,
+            summary="Check auth status",
+        )
         
         return router
     
+    async def warm_up(self) -> None:
+        """
+        Connect to the Auth Gateway ahead of the first user request, e.g. on app startup.
+        
+        Failures are logged rather than raised so an unavailable gateway doesn't block startup.
+        """
+        try:
+            await self.client.health_check()
+            logger.debug("Auth Gateway connection warmed up")
+        except AuthGatewayException as e:
+            logger.warning(f"Auth Gateway warm-up failed: {e.message}")
+        except httpx.HTTPError as e:
+            # Transport errors the client doesn't map, e.g. protocol errors or a bad URL scheme
+            logger.warning(f"Auth Gateway warm-up failed: {type(e).__name__}: {e}")
+    
     async def close(self):
-        """Close the underlying client."""
+        """Close the underlying client, releasing its share of the connection pool, e.g. on app shutdown."""
         await self.client.close()
 
 
@@ -327,25 +342,53 @@ def get_auth_client(base_url: str) -> AuthGatewayClient:
     return AuthGatewayClient(base_url)
 
 
+class CookieToBearerMiddleware:
+    """
+    ASGI middleware that copies the ``access_token`` cookie into an Authorization header.
+    
+    Written as plain ASGI rather than ``@app.middleware("http")`` so requests aren't
+    wrapped in the extra task and streams that BaseHTTPMiddleware adds.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            token = None
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    token = None
+                    break
+                if name == b"cookie" and token is None:
+                    token = _access_token_from_cookie(value)
+            if token:
+                scope = {**scope, "headers": [*scope["headers"], (b"authorization", b"Bearer " + token)]}
+        
+        await self.app(scope, receive, send)
+
+
+def _access_token_from_cookie(cookie: bytes) -> Optional[bytes]:
+    """Get the access_token value from a raw Cookie header, or None if it isn't set."""
+    # Search the raw bytes rather than splitting every cookie pair out of the header
+    start = cookie.find(_ACCESS_TOKEN_COOKIE)
+    while start != -1:
+        # Only a match at the start of a pair counts, not e.g. "my_access_token="
+        if start == 0 or cookie[start - 1] in b" \t;":
+            start += len(_ACCESS_TOKEN_COOKIE)
+            end = cookie.find(b";", start)
+            return cookie[start:end if end != -1 else len(cookie)].strip() or None
+        start = cookie.find(_ACCESS_TOKEN_COOKIE, start + 1)
+    return None
+
+
 def setup_auth_middleware(app, client: AuthGatewayClient):
     """
     Add middleware to extract tokens from cookies and add to request headers.
     
     This middleware helps integrate cookie-based auth with Bearer token dependencies.
+    AuthGatewayFastAPI's own dependencies already fall back to the access_token cookie,
+    so it's only needed when other code reads the Authorization header itself; otherwise
+    leave it out, as it runs on every request, including ones that don't authenticate.
     """
-    @app.middleware("http")
-    async def auth_middleware(request: Request, call_next):
-        # Extract token from cookies and add to headers if not already present
-        if "authorization" not in request.headers:
-            token = request.cookies.get("access_token")
-            if token:
-                # Create a mutable headers dict
-                headers = dict(request.headers)
-                headers["authorization"] = f"Bearer {token}"
-                
-                # Update the request scope
-                request.scope["headers"] = [
-                    (k.encode(), v.encode()) for k, v in headers.items()
-                ]
-        
-        return await call_next(request)
+    app.add_middleware(CookieToBearerMiddleware)
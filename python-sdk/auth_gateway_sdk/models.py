@@ -4,7 +4,7 @@ Pydantic models for Auth Gateway SDK.
 These models mirror the backend models to ensure 100% API compatibility.
 """
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 class UserData(BaseModel):
@@ -76,3 +76,34 @@ class LogoutResponse(BaseModel):
     
     status: str = Field(..., description="Logout status")
     message: Optional[str] = Field(None, description="Logout message")
+
+
+class AuthStatusResponse(BaseModel):
+    """Response model for the FastAPI integration's auth status route."""
+    
+    authenticated: bool = Field(..., description="Whether the request carries a valid token")
+    user: Optional[UserData] = Field(None, description="Authenticated user data")
+
+
+class VerifyTokensRequest(BaseModel):
+    """Request model for batch token verification endpoint."""
+    
+    tokens: List[str] = Field(..., description="Firebase ID tokens to verify")
+
+
+class TokenVerificationResult(BaseModel):
+    """Outcome of verifying one token in a batch."""
+    
+    user: Optional[UserData] = Field(None, description="User data if the token is valid")
+    status_code: Optional[int] = Field(
+        None, description="Status /verify-token would have returned for an invalid token"
+    )
+    message: Optional[str] = Field(None, description="Reason the token was rejected")
+
+
+class VerifyTokensResponse(BaseModel):
+    """Response model for batch token verification endpoint."""
+    
+    results: List[TokenVerificationResult] = Field(
+        ..., description="One result per requested token, in request order"
+    )
@@ -0,0 +1,412 @@
+"""
+Tests for AuthGatewayClient token verification caching.
+"""
+import asyncio
+import base64
+import gc
+import json
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+import httpx
+import pytest
+
+from auth_gateway_sdk import client as client_module
+from auth_gateway_sdk.client import AuthGatewayClient, SyncAuthGatewayClient, close_shared_clients
+from auth_gateway_sdk.config import AuthGatewayConfig
+from auth_gateway_sdk.exceptions import (
+    AuthGatewayException,
+    AuthenticationError,
+    DomainNotAllowedError,
+    RateLimitError,
+    TokenExpiredError,
+    TokenInvalidError,
+)
+from auth_gateway_sdk.models import UserData
+
+USER_PAYLOAD = {"uid": "test-uid-123", "email": "test@example.com"}
+
+
+def make_token(exp: float) -> str:
+    """Build an unsigned JWT-shaped token carrying the given exp claim."""
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).rstrip(b"=").decode()
+    return f"header.{payload}.signature"
+
+
+def make_client(
+    requests: Optional[list] = None, handler: Optional[Callable] = None, **config
+) -> AuthGatewayClient:
+    """
+    Client whose HTTP calls are answered in-process by ``handler``.
+
+    Without a handler, requests are recorded in ``requests`` and answered with USER_PAYLOAD.
+    """
+    if handler is None:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            await asyncio.sleep(0)  # Let concurrent callers pile up on the same request
+            return httpx.Response(200, json=USER_PAYLOAD)
+
+    client = AuthGatewayClient(AuthGatewayConfig(base_url="https://auth-gateway-test.com", **config))
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+class TestVerifyTokenCache:
+    """Test cases for the verify_token result cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_verification_uses_cache(self):
+        """Test that a verified token is not sent to the gateway again."""
+        requests = []
+        async with make_client(requests) as client:
+            token = make_token(time.time() + 3600)
+            first = await client.verify_token(token)
+            second = await client.verify_token(token)
+
+        assert first == second
+        assert first is not second  # Cache hits return their own model instance
+        assert first.uid == "test-uid-123"
+        assert len(requests) == 1
+        assert requests[0].headers["Authorization"] == f"Bearer {token}"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_verifications_share_request(self):
+        """Test that concurrent first-time verifications coalesce into one request."""
+        requests = []
+        async with make_client(requests) as client:
+            token = make_token(time.time() + 3600)
+            results = await asyncio.gather(*(client.verify_token(token) for _ in range(10)))
+
+        assert len(requests) == 1
+        assert all(result.uid == "test-uid-123" for result in results)
+
+    @pytest.mark.asyncio
+    async def test_expired_token_not_reused(self):
+        """Test that a cached result is not reused past the token's exp claim."""
+        requests = []
+        async with make_client(requests) as client:
+            token = make_token(time.time() - 1)
+            await client.verify_token(token)
+            await client.verify_token(token)
+
+        assert len(requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled(self):
+        """Test that a zero TTL sends every verification to the gateway."""
+        requests = []
+        async with make_client(requests, token_cache_ttl=0) as client:
+            token = make_token(time.time() + 3600)
+            await client.verify_token(token)
+            await client.verify_token(token)
+
+        assert client._token_cache is None
+        assert len(requests) == 2
+
+
+class TestVerifyTokens:
+    """Test cases for batch token verification."""
+
+    @pytest.mark.asyncio
+    async def test_verify_tokens_batches_uncached_tokens(self):
+        """Test that uncached tokens share one request and results keep the input order."""
+        valid, cached, expired = (make_token(time.time() + 3600 + i) for i in range(3))
+        bodies = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/verify-token":
+                return httpx.Response(200, json=USER_PAYLOAD)
+            bodies.append(json.loads(request.content))
+            return httpx.Response(200, json={"results": [
+                {"user": USER_PAYLOAD},
+                {"status_code": 401, "message": "Token expired"},
+            ]})
+
+        async with make_client(handler=handler) as client:
+            await client.verify_token(cached)
+            results = await client.verify_tokens([valid, cached, expired, "", valid])
+
+        assert bodies == [{"tokens": [valid, expired]}]
+        assert [type(result) for result in results] == [
+            UserData, UserData, TokenExpiredError, TokenInvalidError, UserData
+        ]
+        assert results[2].status_code == 401
+        # Valid batch results are cached like single verifications
+        assert client._get_cached_user(valid) == results[0]
+
+    @pytest.mark.asyncio
+    async def test_verify_tokens_rejects_short_response(self):
+        """Test that a batch response missing results raises instead of dropping tokens."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"results": [{"user": USER_PAYLOAD}]})
+
+        async with make_client(handler=handler) as client:
+            with pytest.raises(AuthGatewayException, match="expected 2 results, got 1"):
+                await client.verify_tokens(["first-token", "second-token"])
+
+
+class TestGenerateLoginUrl:
+    """Test cases for login URL generation."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("redirect_uri, expected_body", [
+        ("https://client.com/callback", {"redirect_uri": "https://client.com/callback"}),
+        (None, {}),
+    ])
+    async def test_login_request_body(self, redirect_uri, expected_body):
+        """Test that the login request body only carries a redirect URI when one is given."""
+        bodies = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            bodies.append(json.loads(request.content))
+            return httpx.Response(200, json={"url": "https://accounts.google.com/o/oauth2/auth"})
+
+        async with make_client(handler=handler) as client:
+            response = await client.generate_login_url(redirect_uri)
+
+        assert response.url == "https://accounts.google.com/o/oauth2/auth"
+        assert bodies == [expected_body]
+
+
+class TestRetries:
+    """Test cases for request retries."""
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_request_retried_after_backoff(self):
+        """Test that a 429 response is retried after a short backoff."""
+        statuses = iter([429, 200])
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(next(statuses), json={"status": "ok", "service": "Auth Gateway"})
+
+        async with make_client(handler=handler) as client:
+            health = await client.health_check()
+
+        assert health.status == "ok"
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_not_retried_past_timeout(self, monkeypatch):
+        """Test that no backoff is started that would end after the request timeout."""
+        monkeypatch.setattr(client_module.random, "uniform", lambda a, b: 0.0)  # No jitter
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(429)
+
+        async with make_client(handler=handler, timeout=1, retry_attempts=5) as client:
+            with pytest.raises(RateLimitError):
+                await client.health_check()
+
+        # Backoffs of 0.1s, 0.25s and 0.5s fit in the 1s budget; the next 1s doesn't
+        assert len(requests) == 4
+
+    @pytest.mark.asyncio
+    async def test_timed_out_request_retried(self):
+        """Test that a request is retried after an attempt that used up the whole timeout."""
+        attempts = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            attempts.append(request)
+            if len(attempts) == 1:
+                await asyncio.sleep(1)  # The full timeout, as a stalled attempt would take
+                raise httpx.ReadTimeout("Timed out", request=request)
+            return httpx.Response(200, json={"status": "ok", "service": "Auth Gateway"})
+
+        async with make_client(handler=handler, timeout=1) as client:
+            health = await client.health_check()
+
+        assert health.status == "ok"
+        assert len(attempts) == 2
+
+
+class TestHandleErrorResponse:
+    """Test cases for mapping gateway error responses to exceptions."""
+
+    @pytest.mark.parametrize("status_code, message, expected", [
+        (401, "Token expired", TokenExpiredError),
+        (401, "Invalid token", TokenInvalidError),
+        (401, "Authentication required", AuthenticationError),
+        (403, "Email domain not allowed", DomainNotAllowedError),
+        (403, "Forbidden", AuthenticationError),
+        (429, "Slow down", RateLimitError),
+        (500, "Internal error", AuthGatewayException),
+    ])
+    def test_error_status_raises_matching_exception(self, status_code, message, expected):
+        """Test that each error status and message raises the matching exception type."""
+        client = AuthGatewayClient("https://auth-gateway-test.com")
+
+        with pytest.raises(expected, match=message) as exc:
+            client._handle_error_response(httpx.Response(status_code, json={"message": message}))
+
+        assert type(exc.value) is expected
+        assert exc.value.status_code == status_code
+
+    def test_success_status_does_not_raise(self):
+        """Test that successful responses pass through."""
+        client = AuthGatewayClient("https://auth-gateway-test.com")
+        client._handle_error_response(httpx.Response(200, json={}))
+
+
+class TestSharedHttpClient:
+    """Test cases for the HTTP client pool shared between AuthGatewayClient instances."""
+
+    @pytest.mark.asyncio
+    async def test_clients_with_same_settings_share_pool(self):
+        """Test that clients on one event loop with the same settings share an HTTP client."""
+        first = AuthGatewayClient("https://auth-gateway-test.com")
+        second = AuthGatewayClient("https://other-gateway-test.com")
+        insecure = AuthGatewayClient(
+            AuthGatewayConfig(base_url="https://auth-gateway-test.com", verify_ssl=False)
+        )
+        try:
+            assert await first._get_client() is await second._get_client()
+            assert await insecure._get_client() is not await first._get_client()
+        finally:
+            await close_shared_clients()
+
+    @pytest.mark.asyncio
+    async def test_close_keeps_shared_pool_open(self):
+        """Test that closing one client leaves the shared pool usable by the others."""
+        first = AuthGatewayClient("https://auth-gateway-test.com")
+        second = AuthGatewayClient("https://auth-gateway-test.com")
+        try:
+            shared = await first._get_client()
+            assert await second._get_client() is shared
+            await first.close()
+            assert not shared.is_closed
+        finally:
+            await close_shared_clients()
+        assert shared.is_closed
+
+    @pytest.mark.asyncio
+    async def test_pool_closed_with_last_client(self):
+        """Test that the shared pool is closed once every client using it is closed."""
+        first = AuthGatewayClient("https://auth-gateway-test.com")
+        second = AuthGatewayClient("https://auth-gateway-test.com")
+        shared = await first._get_client()
+        await second._get_client()
+
+        await first.close()
+        await second.close()
+
+        assert shared.is_closed
+        assert asyncio.get_running_loop() not in client_module._CLIENT_REGISTRY
+
+    def test_pools_of_closed_loops_dropped(self):
+        """Test that pools left behind by finished asyncio.run() calls are not kept."""
+        async def use_client_without_closing():
+            await AuthGatewayClient("https://auth-gateway-test.com")._get_client()
+            return asyncio.get_running_loop()
+
+        loops = [asyncio.run(use_client_without_closing()) for _ in range(3)]
+
+        assert not any(loop in client_module._CLIENT_REGISTRY for loop in loops[:-1])
+        client_module._CLIENT_REGISTRY.pop(loops[-1], None)
+
+    def test_pools_acquired_from_many_threads(self):
+        """Test that loops on several threads can share the registry concurrently."""
+        errors = []
+        config = AuthGatewayConfig(base_url="https://auth-gateway-test.com", verify_ssl=False)
+
+        def run_loops():
+            try:
+                for _ in range(200):
+                    # Leave each pool open so later acquisitions sweep its closed loop
+                    loop = asyncio.new_event_loop()
+                    loop.run_until_complete(AuthGatewayClient(config)._get_client())
+                    loop.close()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run_loops) for _ in range(8)]
+        # Switch threads as often as possible to interleave the registry updates
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        assert errors == []
+        client_module._CLIENT_REGISTRY.clear()
+
+    @pytest.mark.asyncio
+    async def test_pool_released_from_other_loop_closed_on_its_loop(self):
+        """Test that releasing the last share from another loop still closes the pool."""
+        client = AuthGatewayClient("https://auth-gateway-test.com")
+        http_client = await client._get_client()
+        shared = client._shared_client
+
+        release = client_module._release_shared_http_client(shared)
+        await asyncio.get_running_loop().run_in_executor(None, asyncio.run, release)
+        # The pool is closed by a callback scheduled on this loop
+        for _ in range(10):
+            if http_client.is_closed:
+                break
+            await asyncio.sleep(0)
+
+        assert http_client.is_closed
+        assert asyncio.get_running_loop() not in client_module._CLIENT_REGISTRY
+
+
+class TestSyncAuthGatewayClient:
+    """Test cases for the synchronous client wrapper."""
+
+    def test_calls_share_background_loop(self):
+        """Test that repeated sync calls run on one long-lived event loop."""
+        requests = []
+        client = SyncAuthGatewayClient("https://auth-gateway-test.com")
+        client._async_client = make_client(requests, token_cache_ttl=0)
+        with client:
+            loop = client._loop
+            client.verify_token(make_token(time.time() + 3600))
+            client.verify_token(make_token(time.time() + 3600))
+            assert client._loop is loop and loop.is_running()
+
+        assert len(requests) == 2
+        assert loop.is_closed()
+        client.close()  # Closing twice is a no-op
+
+    def test_unclosed_clients_stop_their_threads(self):
+        """Test that garbage-collected clients don't leave their loop threads running."""
+        threads_before = threading.active_count()
+
+        for _ in range(10):
+            SyncAuthGatewayClient("https://auth-gateway-test.com")
+        gc.collect()
+
+        assert threading.active_count() == threads_before
+
+    def test_usable_after_close(self):
+        """Test that a closed client starts a new event loop when it is used again."""
+        async def running_loop(token):
+            return asyncio.get_running_loop()
+
+        client = SyncAuthGatewayClient("https://auth-gateway-test.com")
+        client._async_client.verify_token = running_loop
+        with client:
+            closed_loop = client.verify_token("token")
+
+        with client:
+            loop = client.verify_token("token")
+            assert loop is not closed_loop and loop.is_running()
+
+        assert closed_loop.is_closed()
+
+    def test_usable_inside_running_event_loop(self):
+        """Test that the sync client works when called from async code."""
+        requests = []
+
+        async def call_from_async():
+            with SyncAuthGatewayClient("https://auth-gateway-test.com") as client:
+                client._async_client = make_client(requests)
+                return client.verify_token(make_token(time.time() + 3600))
+
+        assert asyncio.run(call_from_async()).uid == "test-uid-123"
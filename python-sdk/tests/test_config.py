@@ -0,0 +1,84 @@
+"""
+Tests for AuthGatewayConfig.
+"""
+import pytest
+from pydantic import ValidationError
+
+from auth_gateway_sdk.config import (
+    AuthGatewayConfig,
+    _config_from_env_values,
+    _config_from_url,
+    get_default_config,
+)
+
+
+class TestFromEnv:
+    """Test cases for building configuration from environment variables."""
+
+    def test_from_env_reuses_config_for_same_environment(self, monkeypatch):
+        """Test that unchanged environment values are validated only once."""
+        monkeypatch.setenv("AUTH_GATEWAY_URL", "https://auth-gateway-test.com/")
+        monkeypatch.setenv("AUTH_GATEWAY_TIMEOUT", "10")
+
+        config = AuthGatewayConfig.from_env()
+        hits = _config_from_env_values.cache_info().hits
+
+        assert config.base_url == "https://auth-gateway-test.com"
+        assert config.timeout == 10
+        assert get_default_config() == config
+        assert _config_from_env_values.cache_info().hits == hits + 1
+
+    def test_from_env_config_is_private_copy(self, monkeypatch):
+        """Test that changing a returned config doesn't affect later calls."""
+        monkeypatch.setenv("AUTH_GATEWAY_URL", "https://auth-gateway-test.com")
+        config = AuthGatewayConfig.from_env()
+
+        config.timeout = 1
+
+        assert AuthGatewayConfig.from_env().timeout == 30
+
+    def test_from_env_rereads_changed_environment(self, monkeypatch):
+        """Test that changed environment values produce a new config."""
+        monkeypatch.setenv("AUTH_GATEWAY_URL", "https://auth-gateway-test.com")
+        first = AuthGatewayConfig.from_env()
+
+        monkeypatch.setenv("AUTH_GATEWAY_VERIFY_SSL", "false")
+        second = AuthGatewayConfig.from_env()
+
+        assert second is not first
+        assert second.verify_ssl is False
+
+    def test_from_env_missing_url(self, monkeypatch):
+        """Test that a missing base URL is reported and not cached."""
+        monkeypatch.delenv("AUTH_GATEWAY_URL", raising=False)
+
+        with pytest.raises(ValueError, match="AUTH_GATEWAY_URL is required"):
+            AuthGatewayConfig.from_env()
+        assert get_default_config() is None
+
+
+class TestFromUrl:
+    """Test cases for building configuration from a base URL."""
+
+    def test_from_url_reuses_config_for_same_arguments(self):
+        """Test that repeated calls with the same arguments are validated only once."""
+        config = AuthGatewayConfig.from_url("https://auth-gateway-test.com/", timeout=10)
+        hits = _config_from_url.cache_info().hits
+
+        assert config.base_url == "https://auth-gateway-test.com"
+        assert AuthGatewayConfig.from_url("https://auth-gateway-test.com/", timeout=10) == config
+        assert AuthGatewayConfig.from_url("https://auth-gateway-test.com/") != config
+        assert _config_from_url.cache_info().hits == hits + 1
+
+    def test_from_url_config_is_private_copy(self):
+        """Test that changing a returned config doesn't affect later calls."""
+        config = AuthGatewayConfig.from_url("https://auth-gateway-test.com", timeout=10)
+
+        config.verify_ssl = False
+
+        assert AuthGatewayConfig.from_url("https://auth-gateway-test.com", timeout=10).verify_ssl is True
+
+    def test_from_url_unhashable_override_fails_validation(self):
+        """Test that unexpected override values are reported by validation."""
+        with pytest.raises(ValidationError):
+            AuthGatewayConfig.from_url("https://auth-gateway-test.com", timeout=[10])
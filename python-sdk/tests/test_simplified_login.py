@@ -4,11 +4,13 @@ Test the simplified GET-only login route implementation.
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 from auth_gateway_sdk.integrations.fastapi import AuthGatewayFastAPI
 from auth_gateway_sdk.models import LoginResponse
 
+LOGIN_RESPONSE = LoginResponse(url="https://accounts.google.com/oauth/authorize?...")
+
 
 @patch('auth_gateway_sdk.integrations.fastapi.AuthGatewayClient')
 def test_simplified_login_route(mock_client_class):
@@ -17,14 +19,7 @@ def test_simplified_login_route(mock_client_class):
     # Setup mock client
     mock_client = Mock()
     mock_client_class.return_value = mock_client
-    
-    # Mock the generate_login_url response
-    mock_response = LoginResponse(url="https://accounts.google.com/oauth/authorize?...")
-    
-    async def mock_generate_login_url(redirect_uri=None):
-        return mock_response
-    
-    mock_client.generate_login_url = mock_generate_login_url
+    mock_client.generate_login_url = AsyncMock(return_value=LOGIN_RESPONSE)
     
     # Create FastAPI app with simplified auth routes
     app = FastAPI()
@@ -38,7 +33,8 @@ def test_simplified_login_route(mock_client_class):
     # Test GET /auth/login (should redirect)
     response = client.get("/auth/login", follow_redirects=False)
     assert response.status_code == 307  # FastAPI redirect status code
-    assert response.headers["location"] == mock_response.url
+    assert response.headers["location"] == LOGIN_RESPONSE.url
+    mock_client.generate_login_url.assert_awaited_once_with("http://localhost:8000/auth/callback")
     
     print("✅ GET /auth/login redirects correctly")
 
@@ -50,14 +46,7 @@ def test_login_with_query_param(mock_client_class):
     # Setup mock client
     mock_client = Mock()
     mock_client_class.return_value = mock_client
-    
-    # Mock the generate_login_url response
-    mock_response = LoginResponse(url="https://accounts.google.com/oauth/authorize?...")
-    
-    async def mock_generate_login_url(redirect_uri=None):
-        return mock_response
-    
-    mock_client.generate_login_url = mock_generate_login_url
+    mock_client.generate_login_url = AsyncMock(return_value=LOGIN_RESPONSE)
     
     # Create FastAPI app without default login_redirect_uri
     app = FastAPI()
@@ -71,7 +60,8 @@ def test_login_with_query_param(mock_client_class):
     # Test GET with redirect_uri in query parameter
     response = client.get("/auth/login?redirect_uri=http://custom/callback", follow_redirects=False)
     assert response.status_code == 307  # Should redirect
-    assert response.headers["location"] == mock_response.url
+    assert response.headers["location"] == LOGIN_RESPONSE.url
+    mock_client.generate_login_url.assert_awaited_once_with("http://custom/callback")
     
     print("✅ GET /auth/login with query parameter works")
 
@@ -105,21 +95,12 @@ def test_route_availability(mock_client_class):
     mock_client = Mock()
     mock_client_class.return_value = mock_client
     
-    # Create FastAPI app with auth routes
-    app = FastAPI()
+    # Router route paths already carry the router prefix, so no app is needed
     auth = AuthGatewayFastAPI("https://auth-gateway-test.com")
     router = auth.create_auth_routes()
-    app.include_router(router)
     
     # Get all routes and their methods
-    routes_methods = {}
-    for route in app.routes:
-        if hasattr(route, 'path') and hasattr(route, 'methods'):
-            path = route.path
-            methods = route.methods
-            if path not in routes_methods:
-                routes_methods[path] = set()
-            routes_methods[path].update(methods)
+    routes_methods = {route.path: route.methods for route in router.routes}
     
     # Verify expected routes exist with correct methods
     assert "/auth/login" in routes_methods
@@ -139,26 +120,5 @@ def test_route_availability(mock_client_class):
     print(f"   /auth/login methods: {routes_methods['/auth/login']}")
 
 
-def test_client_pattern_match():
-    """Verify the auto-generated route matches client's working pattern."""
-    
-    print("\n=== CLIENT PATTERN VERIFICATION ===")
-    print("Client's working manual route:")
-    print("@app.get('/auth/login')")
-    print("async def login():")
-    print("    response = await sdk_client.generate_login_url(settings.REDIRECT_URI)")
-    print("    return RedirectResponse(url=response.url)")
-    print("")
-    print("Auto-generated route now:")
-    print("@router.get('/login')")
-    print("async def login_handler(redirect_uri: Optional[str] = None):")
-    print("    uri = redirect_uri or login_redirect_uri")
-    print("    response = await client.generate_login_url(uri)")
-    print("    return RedirectResponse(url=response.url)")
-    print("")
-    print("✅ PERFECT MATCH: Both use GET and return RedirectResponse")
-    print("✅ CLIENT SOLUTION: auth.create_auth_routes(login_redirect_uri='...')")
-
-
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])